@@ -0,0 +1,44 @@
+"""Microbenchmark for constructing LayerRun objects.
+
+Usage::
+
+    python benchmarks/layer_run.py
+"""
+
+import timeit
+
+from laminar import Flow, Layer
+from laminar.configurations import datastores, executors, layers
+
+
+class BenchmarkFlow(Flow): ...
+
+
+@BenchmarkFlow.register
+class Shard(Layer):
+    def __call__(self) -> None:
+        self.shard(**{f"attribute{i}": range(10) for i in range(16)})
+
+
+@BenchmarkFlow.register(
+    container=layers.Container(cpu=4, memory=4000),
+    foreach=layers.ForEach(parameters=[layers.Parameter(layer=Shard, attribute=f"attribute{i}") for i in range(16)]),
+    retry=layers.Retry(attempts=3),
+)
+class Process(Layer):
+    def __call__(self, shard: Shard) -> None: ...
+
+
+def main() -> None:
+    execution = BenchmarkFlow(datastore=datastores.Memory(), executor=executors.Thread()).execution("benchmark")
+
+    number = 10_000
+    timings = timeit.repeat(lambda: execution.layer(Process, index=0), number=number, repeat=5)
+    print(f"Execution.layer(): {min(timings) / number * 1e6:.2f} us per call")
+
+    timings = timeit.repeat(lambda: execution.layer(Process, index=0).configuration, number=number, repeat=5)
+    print(f"Execution.layer().configuration: {min(timings) / number * 1e6:.2f} us per call")
+
+
+if __name__ == "__main__":
+    main()
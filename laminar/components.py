@@ -1,12 +1,14 @@
 """Core components for build flows."""
 
 import copy
+import dataclasses
 import logging
-import operator
+import time
+import types
 from collections import defaultdict
-from collections.abc import Callable, Iterable
+from collections.abc import Callable, Generator, Iterable, Mapping
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from functools import reduce
 from itertools import chain
 from typing import TYPE_CHECKING, Any, ClassVar, TypeVar, cast, overload
 
@@ -15,7 +17,7 @@ from ksuid import KsuidMs
 from laminar.configurations import datastores, executors, flows, hooks, layers, schedulers
 from laminar.exceptions import FlowError
 from laminar.settings import current
-from laminar.types import hints, unwrap
+from laminar.types import names, unwrap
 from laminar.utils import stringify
 
 logger = logging.getLogger(__name__)
@@ -76,6 +78,9 @@ class Layer:
 class LayerRun(Layer):
     """Concrete, fully-specified execution of a registered :class:`Layer`."""
 
+    #: Hook tables of the runtime class for each flow class it runs in
+    _tables: ClassVar[dict[type["Flow"], "HookTable"]]
+
     def __init__(
         self,
         *,
@@ -87,7 +92,6 @@ class LayerRun(Layer):
         **attributes: Any,
     ) -> None:
         self.definition = definition
-        self.configuration = copy.deepcopy(definition.configuration)
         self.execution = execution
         self.attempt = attempt
         self.index = index
@@ -99,6 +103,22 @@ class LayerRun(Layer):
     def name(self) -> str:
         return self.definition.name
 
+    @property
+    def configuration(self) -> layers.Configuration:
+        # Copy each section of the definition's configuration on first use, so that modifying a section (e.g. the
+        # container) never changes the definition. Shallow copies are far cheaper than deep copying every run.
+        if "configuration" not in self.__dict__:
+            configuration = copy.copy(self.definition.configuration)
+            for section in dataclasses.fields(configuration):
+                setattr(configuration, section.name, copy.copy(getattr(configuration, section.name)))
+            self.__dict__["configuration"] = configuration
+
+        return cast(layers.Configuration, self.__dict__["configuration"])
+
+    @configuration.setter
+    def configuration(self, configuration: layers.Configuration) -> None:
+        self.__dict__["configuration"] = configuration
+
     def __repr__(self) -> str:
         return stringify(self, self.name, "execution", "index", "splits")
 
@@ -148,32 +168,37 @@ class LayerRun(Layer):
         return {artifact: value for artifact, value in vars(self).items() if artifact not in LAYER_RESERVED_KEYWORDS}
 
     @property
-    def _hooks(self) -> set[Callable[..., Any]]:
-        return {
-            hook for cls in type(self).__mro__ for hook in vars(cls).values() if hooks.annotation.get(hook) is not None
-        } | {hook for hook in vars(type(self.execution.flow)).values() if hooks.annotation.get(hook) is not None}
+    def _table(self) -> "HookTable":
+        # Runtime classes may be shared by subclassed flows, so the table is built once per flow class
+        cls, flow = type(self), type(self.execution.flow)
+        if "_tables" not in cls.__dict__:
+            cls._tables = {}
+        if (table := cls._tables.get(flow)) is None:
+            table = cls._tables[flow] = HookTable.build(layer=cls, flow=flow)
+        return table
+
+    @property
+    def _hooks(self) -> frozenset[Callable[..., Any]]:
+        return self._table.hooks
 
     @property
     def _parameters(self) -> dict[str, tuple[Layer, ...]]:
         return {
-            "__call__": cast(tuple[LayerRun, ...], hints(self.execution, self.__call__)),
-            **{hook.__name__: cast(tuple[LayerRun, ...], hints(self.execution, hook)) for hook in self._hooks},
+            name: tuple(self.execution.layer(parameter) for parameter in parameters)
+            for name, parameters in self._table.parameters.items()
         }
 
     @property
     def _dependencies(self) -> set[Layer]:
-        return set(chain.from_iterable(self._parameters.values()))
+        return {self.execution.layer(layer) for layer in self._table.dependencies}
 
     @property
     def dependencies(self) -> set[str]:
-        return {layer.name for layer in self._dependencies}
+        return set(self._table.dependencies)
 
     @property
-    def hooks(self) -> dict[str, set[Callable[..., Any]]]:
-        _hooks: dict[str, set[Callable[..., Any]]] = defaultdict(set)
-        for hook in self._hooks:
-            _hooks[unwrap(hooks.annotation.get(hook))].add(hook)
-        return _hooks
+    def hooks(self) -> Mapping[str, frozenset[Callable[..., Any]]]:
+        return self._table.annotations
 
     @property
     def state(self) -> layers.State:
@@ -186,13 +211,37 @@ class LayerRun(Layer):
             *parameters: Input layers to the layer.
         """
 
-        # Attempt to write any existing layer artifacts before failing
+        datastore = self.execution.flow.configuration.datastore
+        started = time.time()
+
+        # Count only the bytes serialized by this split, even when other layers write to the datastore concurrently
+        written = datastores.Counter()
+        token = datastores.WRITTEN.set(written)
+
+        # Attempt to write any existing layer artifacts and the attempt's metrics before failing
         try:
-            with self.configuration.catch:
+            # Catch records the caught exception on itself, so each execution needs its own
+            with copy.copy(self.configuration.catch):
                 self(*parameters)
         finally:
-            for artifact, value in self.artifacts.items():
-                self.execution.flow.configuration.datastore.write(layer=self, name=artifact, values=[value])
+            serializing = time.perf_counter()
+            try:
+                datastore.write_many(
+                    layer=self, artifacts={artifact: [value] for artifact, value in self.artifacts.items()}
+                )
+            finally:
+                serialization = time.perf_counter() - serializing
+                datastores.WRITTEN.reset(token)
+                datastore.write_metrics(
+                    layer=self,
+                    metrics=datastores.Metrics(
+                        attempt=self.attempt,
+                        started=started,
+                        finished=time.time(),
+                        serialization=serialization,
+                        written=written.total,
+                    ),
+                )
 
     def shard(self, **artifacts: Iterable[Any]) -> None:
         """Store each item of a sequence separately so that they may be loaded individually downstream.
@@ -210,8 +259,7 @@ class LayerRun(Layer):
             **artifacts: Sequence to break up and store.
         """
 
-        for artifact, sequence in artifacts.items():
-            self.execution.flow.configuration.datastore.write(layer=self, name=artifact, values=sequence)
+        self.execution.flow.configuration.datastore.write_many(layer=self, artifacts=artifacts)
 
 
 class Parameters(Layer):
@@ -221,6 +269,49 @@ class Parameters(Layer):
 LayerT = TypeVar("LayerT", bound=Layer)
 
 
+@dataclass(frozen=True)
+class HookTable:
+    """Immutable table of the hooks and parameters of a runtime layer class in a flow class."""
+
+    #: Hooks defined on the layer or the flow
+    hooks: frozenset[Callable[..., Any]]
+    #: Hooks grouped by their annotation
+    annotations: Mapping[str, frozenset[Callable[..., Any]]]
+    #: Names of the layers that __call__ and each hook are annotated with
+    parameters: Mapping[str, tuple[str, ...]]
+    #: Names of every layer the layer depends on
+    dependencies: frozenset[str]
+
+    @staticmethod
+    def build(*, layer: type[LayerRun], flow: type["Flow"]) -> "HookTable":
+        """Build the hook table for a runtime layer class.
+
+        Args:
+            layer: Runtime layer class to build the table for.
+            flow: Flow class the layer runs in.
+
+        Returns:
+            Hook table.
+        """
+
+        _hooks = frozenset(
+            hook for cls in layer.__mro__ for hook in vars(cls).values() if hooks.annotation.get(hook) is not None
+        ) | frozenset(hook for hook in vars(flow).values() if hooks.annotation.get(hook) is not None)
+
+        annotations: dict[str, set[Callable[..., Any]]] = defaultdict(set)
+        for hook in _hooks:
+            annotations[unwrap(hooks.annotation.get(hook))].add(hook)
+
+        parameters = {"__call__": names(layer.__call__), **{hook.__name__: names(hook) for hook in _hooks}}
+
+        return HookTable(
+            hooks=_hooks,
+            annotations=types.MappingProxyType({key: frozenset(value) for key, value in annotations.items()}),
+            parameters=types.MappingProxyType(parameters),
+            dependencies=frozenset(chain.from_iterable(parameters.values())),
+        )
+
+
 @dataclass(frozen=True)
 class LayerDefinition:
     """Static registration metadata for a layer class.
@@ -246,6 +337,92 @@ class LayerDefinition:
         return runtime
 
 
+@dataclass(frozen=True)
+class Graph:
+    """Immutable dependency graph of the layers registered to a flow.
+
+    Usage::
+
+        Graph.compile({"A": set(), "B": {"A"}})
+    """
+
+    #: Mapping of each layer to the layers it depends on
+    dependencies: Mapping[str, frozenset[str]]
+    #: Mapping of each layer to the layers that depend on it
+    dependents: Mapping[str, frozenset[str]]
+    #: Layers grouped by depth, where each level only depends on layers in earlier levels
+    levels: tuple[frozenset[str], ...]
+    #: Layers in topological order
+    order: tuple[str, ...]
+
+    @staticmethod
+    def compile(dependencies: Mapping[str, Iterable[str]]) -> "Graph":
+        """Compile a dependency graph.
+
+        Args:
+            dependencies: Mapping of each layer to the layers it depends on.
+
+        Raises:
+            FlowError: If the layers have a circular dependency.
+
+        Returns:
+            Compiled graph.
+        """
+
+        parents = {layer: frozenset(layer_parents) for layer, layer_parents in dependencies.items()}
+
+        children: dict[str, set[str]] = {layer: set() for layer in parents}
+        for layer, layer_parents in parents.items():
+            for parent in layer_parents:
+                children.setdefault(parent, set()).add(layer)
+
+        # Peel off layers whose dependencies have all been placed in earlier levels
+        levels: list[frozenset[str]] = []
+        remaining = {layer: len(layer_parents) for layer, layer_parents in parents.items()}
+        level = frozenset(layer for layer, count in remaining.items() if count == 0)
+        while level:
+            levels.append(level)
+            for layer in level:
+                del remaining[layer]
+            for layer in level:
+                for child in children.get(layer, ()):
+                    remaining[child] -= 1
+            level = frozenset(layer for layer, count in remaining.items() if count == 0)
+
+        if remaining:
+            raise FlowError(f"Circular dependency between layers {sorted(remaining)}.")
+
+        return Graph(
+            dependencies=types.MappingProxyType(parents),
+            dependents=types.MappingProxyType(
+                {layer: frozenset(layer_children) for layer, layer_children in children.items()}
+            ),
+            levels=tuple(levels),
+            order=tuple(layer for level in levels for layer in sorted(level)),
+        )
+
+    def priorities(self, costs: Mapping[str, float]) -> dict[str, float]:
+        """Get the critical path priority of each layer.
+
+        Notes:
+            A layer's priority is the largest total cost of any path from the layer to the end of the graph, so
+            layers on the critical path have the highest priority.
+
+        Args:
+            costs: Mapping of each layer to its cost. Missing layers have no cost.
+
+        Returns:
+            Mapping of each layer to its priority.
+        """
+
+        priorities: dict[str, float] = {}
+        for layer in reversed(self.order):
+            priorities[layer] = costs.get(layer, 0.0) + max(
+                (priorities[dependent] for dependent in self.dependents[layer]), default=0.0
+            )
+        return priorities
+
+
 @dataclass
 class Execution:
     #: ID of the flow execution
@@ -254,15 +431,56 @@ class Execution:
     flow: "Flow"
     #: True if the flow execution is being retried, else False.
     retry: bool = False
+    #: Names of the layers with records in the datastore while the execution is scheduled
+    _records: set[str] | None = field(default=None, init=False, repr=False, compare=False)
 
     def __repr__(self) -> str:
         return stringify(self, type(self).__name__, "id", "retry", "flow")
 
+    @property
+    def records(self) -> set[str]:
+        """Names of the layers that have finished in the execution.
+
+        Notes:
+            While the execution is scheduled, the datastore is listed once and records written by the scheduler are
+            added as they are written. Otherwise the datastore is listed on every read, so long-lived executions see
+            records written by other processes.
+        """
+
+        if self._records is None:
+            return self.flow.configuration.datastore.list_records(execution=self)
+        return self._records
+
+    @contextmanager
+    def snapshot(self) -> Generator[set[str], None, None]:
+        """Answer every read of the execution's records from a single listing of the datastore.
+
+        Notes:
+            Records added to the snapshot, e.g. by the scheduler, are kept until the snapshot ends. Nested snapshots
+            reuse the outermost listing.
+
+        Usage::
+
+            with execution.snapshot():
+                ...
+        """
+
+        if self._records is not None:
+            yield self._records
+            return
+
+        self._records = self.flow.configuration.datastore.list_records(execution=self)
+        try:
+            yield self._records
+        finally:
+            self._records = None
+
     @property
     def finished(self) -> bool:
         """Flow execution is finished."""
 
-        return bool(reduce(operator.and_, [layer.state.finished for layer in self.flow._dependencies.keys()]))
+        with self.snapshot():
+            return all(self.layer(layer).state.finished for layer in self.flow.dependencies)
 
     @property
     def running(self) -> bool:
@@ -443,9 +661,11 @@ class Execution:
             dependencies: Mapping of layers to layers it depends on.
         """
 
-        self.flow.configuration.scheduler.loop(  # type: ignore
-            execution=self, dependencies=dependencies, finished={Parameters.__name__}
-        )
+        # Snapshot the finished layers for the scheduling loop, the scheduler adds the layers it records
+        with self.snapshot():
+            self.flow.configuration.scheduler.loop(  # type: ignore
+                execution=self, dependencies=dependencies, finished={Parameters.__name__}
+            )
 
         return self
 
@@ -466,6 +686,8 @@ class Flow:
     configuration: flows.Configuration
     #: Layers registered with the flow
     registry: dict[str, LayerDefinition] = field(default_factory=dict)
+    #: Dependency graph of the registered layers, compiled on first use
+    _graph: ClassVar[Graph | None] = None
 
     if TYPE_CHECKING:
         # Test fixtures retain an explicit runtime execution without making it
@@ -504,6 +726,7 @@ class Flow:
         definition: LayerDefinition
 
         # Register all subflow layers with this layer
+        cls._graph = None
         cls.registry = {Parameters.__name__: LayerDefinition(Parameters, layers.Configuration())}
         for flow in cls.__bases__:
             for name, definition in getattr(flow, "registry", {}).items():
@@ -516,20 +739,30 @@ class Flow:
                         )
                     cls.registry[name] = copy.deepcopy(definition)
 
+    @property
+    def graph(self) -> Graph:
+        """Dependency graph of the registered layers."""
+
+        # Layer dependencies are defined by the flow class, so the graph is compiled once per class
+        if (graph := type(self)._graph) is None:
+            execution = self.execution("definition")
+            graph = Graph.compile({layer: execution.layer(layer).dependencies for layer in self.registry})
+            type(self)._graph = graph
+        return graph
+
     @property
     def _dependencies(self) -> dict[Layer, set[Layer]]:
         execution = self.execution("definition")
         return {
             execution.layer(child): {execution.layer(parent) for parent in parents}
-            for child, parents in self.dependencies.items()
+            for child, parents in self.graph.dependencies.items()
         }
 
     @property
     def dependencies(self) -> dict[str, set[str]]:
         """A mapping of each layer and the layers it depends on."""
 
-        execution = self.execution("definition")
-        return {layer: execution.layer(layer).dependencies for layer in self.registry}
+        return {layer: set(parents) for layer, parents in self.graph.dependencies.items()}
 
     @property
     def _dependents(self) -> dict[Layer, set[Layer]]:
@@ -543,11 +776,8 @@ class Flow:
     def dependents(self) -> dict[str, set[str]]:
         """A mapping of each layer and the layers that depend on it."""
 
-        dependents: dict[str, set[str]] = defaultdict(set)
-        for child, parents in self.dependencies.items():
-            for parent in parents:
-                dependents[parent].add(child)
-        return dependents
+        # Layers without dependents map to an empty set, as they did before the graph was compiled
+        return defaultdict(set, {layer: set(children) for layer, children in self.graph.dependents.items() if children})
 
     @property
     def name(self) -> str:
@@ -647,6 +877,7 @@ class Flow:
                 )
 
             flow.registry[definition.name] = copy.deepcopy(definition)
+            flow._graph = None
 
         # 1st form: Register a layer with user-defined configurations
         # @Flow.register
@@ -0,0 +1,153 @@
+"""Configurations for laminar artifact compression."""
+
+import gzip
+import importlib
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, BinaryIO, ClassVar, cast
+
+
+@dataclass(frozen=True)
+class Codec:
+    """Store artifacts without compression.
+
+    Usage::
+
+        Flow(datastore=Local(codec=Codec()))
+    """
+
+    #: Name of the codec recorded in artifact metadata
+    name: ClassVar[str] = "none"
+    #: File extension of artifacts written with the codec
+    extension: ClassVar[str] = ""
+
+    @contextmanager
+    def compress(self, file: BinaryIO) -> Generator[BinaryIO, None, None]:
+        """Wrap a file handler so that bytes written to it are compressed.
+
+        Args:
+            file: File handler to write compressed bytes to.
+
+        Returns:
+            File handler to write uncompressed bytes to.
+        """
+
+        yield file
+
+    @contextmanager
+    def decompress(self, file: BinaryIO) -> Generator[BinaryIO, None, None]:
+        """Wrap a file handler so that bytes read from it are decompressed.
+
+        Args:
+            file: File handler to read compressed bytes from.
+
+        Returns:
+            File handler to read uncompressed bytes from.
+        """
+
+        yield file
+
+
+@dataclass(frozen=True)
+class Gzip(Codec):
+    """Compress artifacts with gzip.
+
+    Usage::
+
+        Flow(datastore=Local(codec=Gzip(level=1)))
+    """
+
+    name: ClassVar[str] = "gzip"
+    extension: ClassVar[str] = ".gz"
+
+    #: Compression level from 0 (none) to 9 (smallest)
+    level: int = 9
+
+    @contextmanager
+    def compress(self, file: BinaryIO) -> Generator[BinaryIO, None, None]:
+        with gzip.GzipFile(fileobj=file, mode="wb", compresslevel=self.level) as stream:
+            yield cast(BinaryIO, stream)
+
+    @contextmanager
+    def decompress(self, file: BinaryIO) -> Generator[BinaryIO, None, None]:
+        with gzip.GzipFile(fileobj=file, mode="rb") as stream:
+            yield cast(BinaryIO, stream)
+
+
+@dataclass(frozen=True)
+class Zstd(Codec):
+    """Compress artifacts with Zstandard.
+
+    Notes:
+        Requires the `zstandard` package.
+
+    Usage::
+
+        Flow(datastore=Local(codec=Zstd(level=3)))
+    """
+
+    name: ClassVar[str] = "zstd"
+    extension: ClassVar[str] = ".zst"
+
+    #: Compression level from 1 (fastest) to 22 (smallest)
+    level: int = 3
+
+    @contextmanager
+    def compress(self, file: BinaryIO) -> Generator[BinaryIO, None, None]:
+        zstandard: Any = importlib.import_module("zstandard")
+        with zstandard.ZstdCompressor(level=self.level).stream_writer(file, closefd=False) as stream:
+            yield stream
+
+    @contextmanager
+    def decompress(self, file: BinaryIO) -> Generator[BinaryIO, None, None]:
+        zstandard: Any = importlib.import_module("zstandard")
+        with zstandard.ZstdDecompressor().stream_reader(file, closefd=False) as stream:
+            yield stream
+
+
+@dataclass(frozen=True)
+class LZ4(Codec):
+    """Compress artifacts with LZ4 frames.
+
+    Notes:
+        Requires the `lz4` package.
+
+    Usage::
+
+        Flow(datastore=Local(codec=LZ4()))
+    """
+
+    name: ClassVar[str] = "lz4"
+    extension: ClassVar[str] = ".lz4"
+
+    #: Compression level from 0 (fastest) to 16 (smallest)
+    level: int = 0
+
+    @contextmanager
+    def compress(self, file: BinaryIO) -> Generator[BinaryIO, None, None]:
+        frame: Any = importlib.import_module("lz4.frame")
+        with frame.LZ4FrameFile(file, mode="wb", compression_level=self.level) as stream:
+            yield stream
+
+    @contextmanager
+    def decompress(self, file: BinaryIO) -> Generator[BinaryIO, None, None]:
+        frame: Any = importlib.import_module("lz4.frame")
+        with frame.LZ4FrameFile(file, mode="rb") as stream:
+            yield stream
+
+
+CODECS: dict[str, type[Codec]] = {codec.name: codec for codec in (Codec, Gzip, Zstd, LZ4)}
+
+
+def get(name: str) -> Codec:
+    """Get a codec that can decompress artifacts written with the named codec.
+
+    Args:
+        name: Name of the codec recorded in artifact metadata.
+
+    Returns:
+        Codec instance.
+    """
+
+    return CODECS[name]()
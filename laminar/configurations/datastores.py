@@ -2,23 +2,38 @@
 
 import builtins
 import copy
+import dataclasses
 import json
+import math
+import os
 import re
-from collections.abc import Callable, Generator, Iterable
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Generator, Hashable, Iterable
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, BinaryIO, overload
+from typing import TYPE_CHECKING, Any, BinaryIO, cast, overload
 
-import boto3
-
-from laminar.configurations import serde
-from laminar.utils import fs
+from laminar.configurations import codecs, serde
+from laminar.utils import concurrency, fs
 
 if TYPE_CHECKING:
     from laminar import Execution, Flow, Layer
 
 DEFAULT_SERDE = serde.PickleProtocol()
 
+#: Bytes of a serialized artifact to hold in memory before staging spills to a temporary file.
+STAGING_SIZE = 64 * 1024 * 1024
+#: Default bytes of artifact files to keep in a disk cache.
+DISK_CAPACITY = 10 * 1024 * 1024 * 1024
+#: Fraction of its capacity a disk cache evicts down to once it grows beyond capacity.
+DISK_TARGET = 0.9
+
 ARCHIVE_PATTERN = re.compile(
     r"^.+"  # Greedily match from start
     r"\/(?P<flow>.+?)"  # Match flow name
@@ -29,6 +44,297 @@ ARCHIVE_PATTERN = re.compile(
     r"(?:\/(?P<artifact>.+?)\.json)?$"  # Match artifact name
 )
 
+RECORD_PATTERN = re.compile(
+    r"^.+"  # Greedily match from start
+    r"\/(?P<flow>.+?)"  # Match flow name
+    r"\/\.cache"  # Match cache directory
+    r"\/(?P<execution>.+?)"  # Match execution id
+    r"\/(?P<layer>[^\/]+?)"  # Match layer name
+    r"\/\.record\.json$"  # Match record file
+)
+
+METRICS_PATTERN = re.compile(
+    r"^.+"  # Greedily match from start
+    r"\/(?P<flow>.+?)"  # Match flow name
+    r"\/metrics"  # Match metrics directory
+    r"\/(?P<execution>.+?)"  # Match execution id
+    r"\/(?P<layer>[^\/]+?)"  # Match layer name
+    r"\/(?P<split>\d+)"  # Match split index
+    r"\/(?P<attempt>\d+)\.json$"  # Match attempt
+)
+
+
+@dataclass
+class Statistics:
+    """Thread-safe hit/miss counters for a datastore optimization."""
+
+    #: Number of times the optimization applied
+    hits: int = 0
+    #: Number of times the optimization did not apply
+    misses: int = 0
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> builtins.dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def __setstate__(self, state: builtins.dict[str, int]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def hit(self) -> None:
+        """Count a hit."""
+
+        with self._lock:
+            self.hits += 1
+
+    def miss(self) -> None:
+        """Count a miss."""
+
+        with self._lock:
+            self.misses += 1
+
+
+@dataclass
+class Counter:
+    """Thread-safe running total."""
+
+    #: Running total
+    total: int = 0
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> builtins.dict[str, int]:
+        return {"total": self.total}
+
+    def __setstate__(self, state: builtins.dict[str, int]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, value: int) -> None:
+        """Add to the total."""
+
+        with self._lock:
+            self.total += value
+
+
+#: Running total of the bytes of artifacts serialized in the current context, e.g. by a layer split
+WRITTEN: ContextVar[Counter | None] = ContextVar("WRITTEN", default=None)
+
+
+@dataclass
+class LRU:
+    """Thread-safe least recently used cache of deserialized artifact values bounded by their size in bytes.
+
+    Notes:
+        The size of a value is the number of serialized bytes it was loaded from. Cached values are shared between
+        every reader in the process, including layers executing concurrently, so the cache is disabled by default.
+        Only enable it when layers treat their inputs as read only.
+
+    Usage::
+
+        Flow(datastore=Local(lru=LRU(capacity=1024**3)))
+    """
+
+    #: Maximum total size in bytes of the values to keep, 0 disables the cache
+    capacity: int = 0
+    #: Hits/misses of artifact reads served from the cache
+    statistics: Statistics = field(default_factory=Statistics)
+    #: Number of values evicted to stay within capacity
+    evictions: int = 0
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._size = 0
+
+    def __getstate__(self) -> builtins.dict[str, Any]:
+        # Cached values are process local and are not sent along with the datastore
+        return {"capacity": self.capacity, "statistics": self.statistics, "evictions": self.evictions}
+
+    def __setstate__(self, state: builtins.dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.__post_init__()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of the cached values."""
+
+        return self._size
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Get a value from the cache, marking it as the most recently used.
+
+        Args:
+            key: Key of the value.
+
+        Returns:
+            Whether the value was cached and the value if so.
+        """
+
+        with self._lock:
+            if key not in self._entries:
+                self.statistics.miss()
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.statistics.hit()
+            return True, self._entries[key][0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        """Add a value to the cache, evicting the least recently used values to stay within capacity.
+
+        Args:
+            key: Key of the value.
+            value: Value to cache.
+            size: Size of the value in bytes.
+        """
+
+        # Values that would evict everything else aren't worth keeping
+        if size > self.capacity:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+
+            self._entries[key] = (value, size)
+            self._size += size
+
+            while self._size > self.capacity:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+                self.evictions += 1
+
+
+@dataclass(frozen=True)
+class DiskCache:
+    """Read-through cache of artifact files on local disk.
+
+    Notes:
+        Artifact files are stored as is under their content address, so every flow and process on a host can share
+        the same directory. Files are placed atomically and the least recently read files are evicted once the
+        directory grows beyond capacity.
+
+        The directory is only scanned when a running total of its size goes past capacity, and eviction then frees
+        space down to DISK_TARGET of capacity so that the next scan is several downloads away.
+
+    Usage::
+
+        Flow(datastore=AWS.S3(disk=DiskCache(directory="/mnt/laminar", capacity=100 * 1024**3)))
+    """
+
+    #: Directory to cache artifact files in
+    directory: str = str(Path(tempfile.gettempdir()) / "laminar")
+    #: Maximum total size in bytes of the cached artifact files
+    capacity: int = DISK_CAPACITY
+    #: Hits/misses of artifact reads served from disk
+    statistics: Statistics = field(default_factory=Statistics)
+    #: Running total of the cached bytes, unknown until the directory is first scanned
+    _size: int | None = field(default=None, init=False, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def __getstate__(self) -> builtins.dict[str, Any]:
+        return {"directory": self.directory, "capacity": self.capacity, "statistics": self.statistics}
+
+    def __setstate__(self, state: builtins.dict[str, Any]) -> None:
+        self.__dict__.update(state, _size=None, _lock=threading.Lock())
+
+    def path(self, *, artifact: "Artifact") -> Path:
+        """Get the path to an artifact's cached file."""
+
+        return Path(self.directory) / f"{artifact.hexdigest}{codecs.get(artifact.codec).extension}"
+
+    @contextmanager
+    def open(self, *, uri: str, artifact: "Artifact") -> Generator[BinaryIO, None, None]:
+        """Open an artifact's cached file, downloading it first if it isn't cached.
+
+        Args:
+            uri: URI to download the artifact file from.
+            artifact: Artifact to open.
+
+        Returns:
+            File handler of the artifact's bytes as they are stored in the datastore.
+        """
+
+        path = self.path(artifact=artifact)
+
+        file: BinaryIO
+        try:
+            file = builtins.open(path, "rb")
+        except FileNotFoundError:
+            self.statistics.miss()
+            file = self._download(uri=uri, path=path)
+        else:
+            self.statistics.hit()
+            # Another process may evict the file, but the open handler still reads it
+            with suppress(FileNotFoundError):
+                os.utime(path)
+
+        with file:
+            yield file
+
+    def evict(self, *, target: float = DISK_TARGET) -> None:
+        """Remove the least recently read files until the cache is within a fraction of capacity.
+
+        Args:
+            target: Fraction of capacity to shrink the cache to.
+        """
+
+        files = []
+        for path in Path(self.directory).iterdir():
+            # Skip files being downloaded
+            if path.name.startswith("."):
+                continue
+            with suppress(FileNotFoundError):
+                stat = path.stat()
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(size for _, size, _ in files)
+        for _, evicted, path in sorted(files):
+            if size <= self.capacity * target:
+                break
+            path.unlink(missing_ok=True)
+            size -= evicted
+
+        with self._lock:
+            object.__setattr__(self, "_size", size)
+
+    def _grow(self, size: int) -> None:
+        with self._lock:
+            total = None if self._size is None else self._size + size
+            object.__setattr__(self, "_size", total)
+
+        # Other processes may share the directory, so the total is resynchronized whenever it is scanned
+        if total is None or total > self.capacity:
+            self.evict()
+
+    def _download(self, *, uri: str, path: Path) -> BinaryIO:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Download beside the destination and rename so other processes never read a partial file. The handler
+        # stays open across the rename, so the download can be read even if it is evicted right away.
+        temporary = path.with_name(f".{uuid.uuid4().hex}.{path.name}")
+        file = builtins.open(temporary, "w+b")
+        try:
+            with fs.open(uri, "rb", compression="disable") as source:
+                shutil.copyfileobj(source, file)
+            file.flush()
+            os.replace(temporary, path)
+        except BaseException:
+            file.close()
+            temporary.unlink(missing_ok=True)
+            raise
+
+        self._grow(file.tell())
+        file.seek(0)
+        return cast(BinaryIO, file)
+
 
 @dataclass(frozen=True)
 class Record:
@@ -48,6 +354,10 @@ class Record:
     class ExecutionRecord:
         #: Number of splits in the layer
         splits: int
+        #: Epoch seconds when the layer's splits were submitted to the executor
+        submitted: float | None = None
+        #: Epoch seconds when every split of the layer finished
+        finished: float | None = None
 
     #: Flow record information
     flow: FlowRecord
@@ -88,23 +398,118 @@ class RecordProtocol(serde.Protocol):
         return json.dumps(value.dict()).encode()
 
 
+@dataclass(frozen=True)
+class Metrics:
+    """Handler for runtime statistics of a single Layer split."""
+
+    #: Attempt of the split
+    attempt: int
+    #: Epoch seconds when the split started executing
+    started: float
+    #: Epoch seconds when the split finished executing
+    finished: float
+    #: Seconds spent serializing and writing the split's artifacts
+    serialization: float
+    #: Bytes of artifacts serialized by the split
+    written: int
+
+    @property
+    def duration(self) -> float:
+        """Seconds the split spent executing."""
+
+        return self.finished - self.started
+
+    @staticmethod
+    def path(*, layer: "Layer", index: int, attempt: int) -> str:
+        """Get the path to the Metrics."""
+
+        return fs.join(
+            layer.execution.flow.name, "metrics", layer.execution.id, layer.name, str(index), f"{attempt}.json"
+        )
+
+    def dict(self) -> dict[str, Any]:
+        """Convert the Metrics to a dict."""
+
+        return asdict(self)
+
+    @staticmethod
+    def parse(source: builtins.dict[str, Any]) -> "Metrics":
+        """Get Metrics from a dict."""
+
+        return Metrics(**source)
+
+
+class MetricsProtocol(serde.Protocol):
+    """Custom protocol for serializing Metrics."""
+
+    def load(self, file: BinaryIO) -> Metrics:
+        return Metrics.parse(json.load(file))
+
+    def dumps(self, value: Metrics) -> bytes:
+        return json.dumps(value.dict()).encode()
+
+
+@dataclass(frozen=True)
+class Summary:
+    """Distribution of a runtime statistic.
+
+    Usage::
+
+        Summary.build([metrics.duration for metrics in datastore.read_metrics(layer=layer)]).p95
+    """
+
+    #: Number of values
+    count: int
+    #: Median value
+    p50: float
+    #: 95th percentile value
+    p95: float
+    #: Largest value
+    max: float
+
+    @staticmethod
+    def build(values: Iterable[float]) -> "Summary":
+        """Summarize values with nearest-rank percentiles.
+
+        Args:
+            values: Values to summarize.
+
+        Raises:
+            ValueError: If there are no values.
+
+        Returns:
+            Summary of the values.
+        """
+
+        ordered = sorted(values)
+        if not ordered:
+            raise ValueError("Cannot summarize an empty sequence of values.")
+
+        def percentile(rank: float) -> float:
+            return ordered[max(math.ceil(rank * len(ordered)) - 1, 0)]
+
+        return Summary(count=len(ordered), p50=percentile(0.5), p95=percentile(0.95), max=ordered[-1])
+
+
 @dataclass(frozen=True)
 class Artifact:
     """Handler for artifacts in the laminar datastore.
 
     Notes:
-        Artifacts are gziped, pickled layer instance attributes.
+        Artifacts are compressed, serialized layer instance attributes.
     """
 
     #: Data type of the artifact.
     dtype: str
     #: SHA256 hexdigest of the artifact bytes.
     hexdigest: str
+    #: Name of the codec the artifact is compressed with.
+    codec: str = codecs.Gzip.name
 
     def path(self, *, layer: "Layer") -> str:
         """Get the path to the Artifact."""
 
-        return fs.join(layer.execution.flow.name, "artifacts", f"{self.hexdigest}.gz")
+        return fs.join(layer.execution.flow.name, "artifacts", f"{self.hexdigest}{codecs.get(self.codec).extension}")
 
     def dict(self) -> dict[str, str]:
         """Convert the Artifact to a dict."""
@@ -167,14 +572,196 @@ class ArchiveProtocol(serde.Protocol):
         return json.dumps(value.dict()).encode()
 
 
+@dataclass(frozen=True)
+class Plan:
+    """Handler for the precomputed foreach inputs shared by every split of a layer.
+
+    Notes:
+        Plans are computed once by the scheduler so that each split reads a single object to find its inputs
+        instead of reading every parameter archive.
+    """
+
+    @dataclass(frozen=True)
+    class Input:
+        #: Name of the layer the parameter reads from
+        layer: str
+        #: Attribute of the layer the parameter reads from
+        attribute: str
+        #: Archive of the attribute values
+        archive: Archive
+
+    #: Foreach parameter inputs
+    inputs: list[Input]
+    #: How inputs are combined, either "product" or "zip"
+    mode: str = "product"
+    #: Number of combined inputs assigned to each split
+    batch_size: int = 1
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """Number of values of each input."""
+
+        return tuple(len(input.archive) for input in self.inputs)
+
+    @property
+    def size(self) -> int:
+        """Number of combinations of the inputs."""
+
+        if self.mode == "zip" and self.inputs:
+            return len(self.inputs[0].archive)
+        return math.prod(self.shape)
+
+    @property
+    def splits(self) -> int:
+        """Number of splits the combinations are batched into."""
+
+        return math.ceil(self.size / self.batch_size)
+
+    def batch(self, split: int) -> range:
+        """Get the combinations assigned to a split.
+
+        Args:
+            split: Index of the split.
+
+        Raises:
+            IndexError: If the split is outside of the plan.
+
+        Returns:
+            Contiguous range of combination indexes.
+        """
+
+        if not 0 <= split < self.splits:
+            raise IndexError(f"Split '{split}' is outside of the foreach plan of '{self.splits}' splits.")
+
+        return range(split * self.batch_size, min((split + 1) * self.batch_size, self.size))
+
+    def indexes(self, index: int) -> list[int]:
+        """Get the index into each input's archive for a combination.
+
+        Notes:
+            In "product" mode, decodes the combination index as a mixed-radix number whose digits are the input
+            indexes with the last input varying fastest. In "zip" mode, every input shares the combination index.
+
+        Args:
+            index: Index of the combination.
+
+        Raises:
+            IndexError: If the index is outside of the plan.
+
+        Returns:
+            Archive index of each input.
+        """
+
+        if not 0 <= index < self.size:
+            raise IndexError(f"Index '{index}' is outside of the foreach plan of '{self.size}' combinations.")
+
+        if self.mode == "zip":
+            return [index] * len(self.inputs)
+
+        digits: list[int] = []
+        for size in reversed(self.shape):
+            index, digit = divmod(index, size)
+            digits.append(digit)
+        return digits[::-1]
+
+    @staticmethod
+    def path(*, layer: "Layer") -> str:
+        """Get the path to the Plan."""
+
+        return fs.join(layer.execution.flow.name, ".cache", layer.execution.id, layer.name, ".plan.json")
+
+    def dict(self) -> dict[str, Any]:
+        """Convert the Plan to a dict."""
+
+        return asdict(self)
+
+    @staticmethod
+    def parse(source: builtins.dict[str, Any]) -> "Plan":
+        """Get a Plan from a dict."""
+
+        return Plan(
+            inputs=[
+                Plan.Input(layer=input["layer"], attribute=input["attribute"], archive=Archive.parse(input["archive"]))
+                for input in source["inputs"]
+            ],
+            mode=source.get("mode", "product"),
+            batch_size=source.get("batch_size", 1),
+        )
+
+
+class PlanProtocol(serde.Protocol):
+    """Custom protocol for serializing Plans."""
+
+    def load(self, file: BinaryIO) -> Plan:
+        return Plan.parse(json.load(file))
+
+    def dumps(self, value: Plan) -> bytes:
+        return json.dumps(value.dict()).encode()
+
+
+@dataclass(frozen=True)
+class Manifest:
+    """Handler for the joined archives of every split of a layer.
+
+    Notes:
+        Manifests are compacted by the scheduler after a layer with multiple splits finishes so that joining an
+        attribute across splits reads a single object instead of an archive per split.
+    """
+
+    #: Artifact names mapped to the archive joined across splits
+    archives: dict[str, Archive]
+    #: Artifact names written by some splits but not others
+    missing: list[str] = field(default_factory=list)
+
+    @staticmethod
+    def path(*, layer: "Layer") -> str:
+        """Get the path to the Manifest."""
+
+        return fs.join(layer.execution.flow.name, ".cache", layer.execution.id, layer.name, ".manifest.json")
+
+    def dict(self) -> dict[str, Any]:
+        """Convert the Manifest to a dict."""
+
+        return asdict(self)
+
+    @staticmethod
+    def parse(source: builtins.dict[str, Any]) -> "Manifest":
+        """Get a Manifest from a dict."""
+
+        return Manifest(
+            archives={name: Archive.parse(archive) for name, archive in source["archives"].items()},
+            missing=source.get("missing", []),
+        )
+
+
+class ManifestProtocol(serde.Protocol):
+    """Custom protocol for serializing Manifests."""
+
+    def load(self, file: BinaryIO) -> Manifest:
+        return Manifest.parse(json.load(file))
+
+    def dumps(self, value: Manifest) -> bytes:
+        return json.dumps(value.dict()).encode()
+
+
 @dataclass(frozen=True)
 class Accessor:
-    """Artifact handler for sharded artifacts."""
+    """Artifact handler for sharded artifacts.
+
+    Usage::
+
+        for value in accessor.prefetch(16):
+            ...
+
+        accessor.read_many([0, 5, 10])
+    """
 
     #: Archive the accessor is reading from
     archive: Archive
     #: Layer to read the archive with
     layer: "Layer"
+    #: Number of artifacts to read ahead concurrently when reading multiple artifacts
+    window: int = 1
 
     @overload
     def __getitem__(self, key: int) -> Any: ...
@@ -183,34 +770,56 @@ class Accessor:
     def __getitem__(self, key: slice) -> list[Any]: ...
 
     def __getitem__(self, key: int | slice) -> Any:
-        datastore = self.layer.execution.flow.configuration.datastore
-
         # Directly access an index
         if isinstance(key, int):
             if key >= len(self.archive):
                 raise IndexError
 
-            return datastore.read_artifact(layer=self.layer, archive=Archive(artifacts=[self.archive.artifacts[key]]))
+            return self._read(self.archive.artifacts[key])
 
         # Slicing for multiple splits
         elif isinstance(key, slice):
-            return [
-                datastore.read_artifact(layer=self.layer, archive=Archive(artifacts=[artifact]))
-                for artifact in self.archive.artifacts[key]
-            ]
+            return self.read_many(range(len(self.archive))[key])
 
         else:
             raise TypeError(f"{type(key)} is not a valid key type for Accessor.__getitem__")
 
     def __iter__(self) -> Generator[Any, None, None]:
-        for artifact in self.archive.artifacts:
-            yield self.layer.execution.flow.configuration.datastore.read_artifact(
-                layer=self.layer, archive=Archive(artifacts=[artifact])
-            )
+        yield from concurrency.imap(self._read, self.archive.artifacts, concurrency=self.window)
 
     def __len__(self) -> int:
         return len(self.archive)
 
+    def _read(self, artifact: Artifact) -> Any:
+        return self.layer.execution.flow.configuration.datastore.read_artifact(
+            layer=self.layer, archive=Archive(artifacts=[artifact])
+        )
+
+    def prefetch(self, window: int) -> "Accessor":
+        """Create an accessor that reads ahead concurrently when reading multiple artifacts.
+
+        Args:
+            window: Number of artifacts to read at once.
+
+        Returns:
+            Accessor over the same artifacts.
+        """
+
+        return dataclasses.replace(self, window=window)
+
+    def read_many(self, indices: Iterable[int]) -> list[Any]:
+        """Read multiple artifacts concurrently.
+
+        Args:
+            indices: Indexes of the artifacts to read.
+
+        Returns:
+            Artifact values in the order of the indexes.
+        """
+
+        artifacts = [self.archive.artifacts[index] for index in indices]
+        return list(concurrency.imap(self._read, artifacts, concurrency=self.window))
+
 
 @dataclass(frozen=True)
 class DataStore:
@@ -222,14 +831,31 @@ class DataStore:
     cache: dict[str, Any] = field(default_factory=dict)
     #: Custom serde protocols for reading/writing artifacts
     protocols: dict[str, serde.Protocol] = field(default_factory=dict)
+    #: URIs of artifacts known to already exist in the datastore
+    committed: set[str] = field(default_factory=set, repr=False)
+    #: Hits/misses of artifact writes skipped because the content address already exists
+    deduplication: Statistics = field(default_factory=Statistics)
+    #: Number of artifacts to read or write at once during bulk operations
+    concurrency: int = 1
+    #: Codec to compress newly written artifacts with
+    codec: codecs.Codec = field(default_factory=codecs.Gzip)
+    #: In-process cache of deserialized artifact values shared by every layer reading from the datastore
+    lru: LRU = field(default_factory=LRU, repr=False)
 
     def __post_init__(self) -> None:
         if not self.root.endswith(("://", ":///")):
             object.__setattr__(self, "root", self.root.rstrip("/"))
 
         self.protocols[ArchiveProtocol.dtype] = ArchiveProtocol()
+        self.protocols[ManifestProtocol.dtype] = ManifestProtocol()
+        self.protocols[MetricsProtocol.dtype] = MetricsProtocol()
+        self.protocols[PlanProtocol.dtype] = PlanProtocol()
         self.protocols[RecordProtocol.dtype] = RecordProtocol()
 
+    def __getstate__(self) -> builtins.dict[str, Any]:
+        # Process local caches grow over an execution and are rebuilt by each process, so they aren't copied
+        return {**self.__dict__, "cache": {}, "committed": set()}
+
     def uri(self, *, path: str) -> str:
         """Given a path, generate a URI in the datastore.
 
@@ -254,6 +880,18 @@ class DataStore:
 
         return fs.exists(uri=self.uri(path=path))
 
+    def exists_many(self, *, paths: Iterable[str]) -> list[bool]:
+        """Check if multiple files exist in the datastore at once.
+
+        Args:
+            paths: Paths from the datastore root to the files.
+
+        Returns:
+            True for each file that exists, else False.
+        """
+
+        return list(concurrency.imap(lambda path: self.exists(path=path), paths, concurrency=self.concurrency))
+
     def protocol(self, *dtypes: type) -> Callable[[type[serde.ProtocolType]], type[serde.ProtocolType]]:
         """Register a custom serde protocol for a type.
 
@@ -304,11 +942,11 @@ class DataStore:
         # Read the artifact value
         if len(archive) == 1:
             artifact = archive.artifacts[0]
-            return self._read(uri=self.uri(path=artifact.path(layer=layer)), dtype=artifact.dtype)
+            return self._read_artifact(uri=self.uri(path=artifact.path(layer=layer)), artifact=artifact)
 
         # Create an accessor for the artifacts
         else:
-            return Accessor(archive=archive, layer=layer)
+            return Accessor(archive=archive, layer=layer, window=self.concurrency)
 
     def read_record(self, *, layer: "Layer") -> Record:
         """Read a layer record from the laminar datastore.
@@ -323,9 +961,99 @@ class DataStore:
         record: Record = self._read(uri=self.uri(path=Record.path(layer=layer)), dtype=RecordProtocol.dtype)
         return record
 
+    def read_manifest(self, *, layer: "Layer") -> Manifest:
+        """Read a layer's manifest from the laminar datastore.
+
+        Args:
+            layer: Layer to get the manifest for.
+
+        Returns:
+            Layer manifest.
+        """
+
+        manifest: Manifest = self._read(uri=self.uri(path=Manifest.path(layer=layer)), dtype=ManifestProtocol.dtype)
+        return manifest
+
+    def read_metrics(self, *, layer: "Layer", attempts: bool = False) -> list[Metrics]:
+        """Read the runtime statistics of every split of a layer from the laminar datastore.
+
+        Notes:
+            Splits without metrics, e.g. from executions written before metrics were recorded, are skipped.
+
+        Args:
+            layer: Layer to get the metrics for.
+            attempts: Read the metrics of every attempt, including failed attempts, instead of only the last attempt.
+
+        Returns:
+            Metrics of each split in split order, then attempt order.
+        """
+
+        # List every split's metrics in one listing instead of checking each split and attempt
+        found: builtins.dict[int, list[int]] = {}
+        prefix = self.uri(path=fs.join(layer.execution.flow.name, "metrics", layer.execution.id, layer.name))
+        for split, attempt in self._list_metrics(prefix=prefix):
+            found.setdefault(split, []).append(attempt)
+
+        paths = [
+            Metrics.path(layer=layer, index=split, attempt=attempt)
+            for split in sorted(found)
+            for attempt in (sorted(found[split]) if attempts else [max(found[split])])
+        ]
+
+        return list(
+            concurrency.imap(
+                lambda path: self._read(uri=self.uri(path=path), dtype=MetricsProtocol.dtype),
+                paths,
+                concurrency=self.concurrency,
+            )
+        )
+
+    def read_plan(self, *, layer: "Layer") -> Plan:
+        """Read a layer's foreach plan from the laminar datastore.
+
+        Args:
+            layer: Layer to get the plan for.
+
+        Returns:
+            Layer foreach plan.
+        """
+
+        plan: Plan = self._read(uri=self.uri(path=Plan.path(layer=layer)), dtype=PlanProtocol.dtype)
+        return plan
+
     def _read(self, *, uri: str, dtype: str) -> Any:
         return self.protocols.get(dtype, DEFAULT_SERDE).read(uri)
 
+    def _read_artifact(self, *, uri: str, artifact: Artifact) -> Any:
+        # Artifacts are immutable, so a value deserialized once can be shared by every reader
+        key = (artifact.dtype, artifact.hexdigest)
+        cached, value = self.lru.get(key)
+        if cached:
+            return value
+
+        value, size = self._load_artifact(uri=uri, artifact=artifact)
+        if size is not None:
+            self.lru.put(key, value, size)
+        return value
+
+    def _load_artifact(self, *, uri: str, artifact: Artifact) -> tuple[Any, int | None]:
+        serializer = self.protocols.get(artifact.dtype, DEFAULT_SERDE)
+
+        # Protocols that read directly from a URI handle their own decompression and storage
+        if serde.overrides(serializer, "read"):
+            return serializer.read(uri), None
+
+        with (
+            self._open_artifact(uri=uri, artifact=artifact) as file,
+            codecs.get(artifact.codec).decompress(file) as stream,
+        ):
+            return serializer.load(stream), stream.tell()
+
+    @contextmanager
+    def _open_artifact(self, *, uri: str, artifact: Artifact) -> Generator[BinaryIO, None, None]:
+        with fs.open(uri, "rb", compression="disable") as file:
+            yield file
+
     def read(self, *, layer: "Layer", index: int, name: str) -> Any:
         """Read from the laminar datastore.
 
@@ -374,11 +1102,40 @@ class DataStore:
 
         dtype = serde.dtype(type(value))
         serializer = self.protocols.get(dtype, DEFAULT_SERDE)
-        artifact = Artifact(dtype=dtype, hexdigest=serializer.hexdigest(value))
-        self._write(value=value, uri=self.uri(path=artifact.path(layer=layer)), dtype=artifact.dtype)
+
+        # Protocols that write directly to a URI need the content address up front and keep the gzip extension
+        if serde.overrides(serializer, "write"):
+            artifact = Artifact(dtype=dtype, hexdigest=serializer.hexdigest(value))
+            if not self._deduplicate(path=artifact.path(layer=layer)):
+                self._write(value=value, uri=self.uri(path=artifact.path(layer=layer)), dtype=artifact.dtype)
+                self.committed.add(self.uri(path=artifact.path(layer=layer)))
+            return artifact
+
+        # Serialize once, hashing the bytes as they are staged, then commit them under the content address
+        with tempfile.SpooledTemporaryFile(max_size=STAGING_SIZE) as staged:
+            hexdigest = serializer.stage(value, cast(BinaryIO, staged))
+            if (written := WRITTEN.get()) is not None:
+                written.add(staged.tell())
+            artifact = Artifact(dtype=dtype, hexdigest=hexdigest, codec=self.codec.name)
+            if not self._deduplicate(path=artifact.path(layer=layer)):
+                staged.seek(0)
+                self._commit(value=value, staged=cast(BinaryIO, staged), uri=self.uri(path=artifact.path(layer=layer)))
+                self.committed.add(self.uri(path=artifact.path(layer=layer)))
 
         return artifact
 
+    def _deduplicate(self, *, path: str) -> bool:
+        """Check if a content addressed artifact already exists and doesn't need to be written again."""
+
+        uri = self.uri(path=path)
+        if uri in self.committed or self.exists(path=path):
+            self.committed.add(uri)
+            self.deduplication.hit()
+            return True
+
+        self.deduplication.miss()
+        return False
+
     def write_record(self, *, layer: "Layer", record: Record) -> None:
         """Write a layer record to the laminar datastore.
 
@@ -389,9 +1146,47 @@ class DataStore:
 
         self._write(value=record, uri=self.uri(path=record.path(layer=layer)), dtype=RecordProtocol.dtype)
 
+    def write_manifest(self, *, layer: "Layer", manifest: Manifest) -> None:
+        """Write a layer's manifest to the laminar datastore.
+
+        Args:
+            layer: Layer the manifest is for.
+            manifest: Manifest to write.
+        """
+
+        self._write(value=manifest, uri=self.uri(path=Manifest.path(layer=layer)), dtype=ManifestProtocol.dtype)
+
+    def write_metrics(self, *, layer: "Layer", metrics: Metrics) -> None:
+        """Write the runtime statistics of a layer split to the laminar datastore.
+
+        Args:
+            layer: Layer split the metrics are for.
+            metrics: Metrics to write.
+        """
+
+        self._write(
+            value=metrics,
+            uri=self.uri(path=Metrics.path(layer=layer, index=layer.index, attempt=metrics.attempt)),
+            dtype=MetricsProtocol.dtype,
+        )
+
+    def write_plan(self, *, layer: "Layer", plan: Plan) -> None:
+        """Write a layer's foreach plan to the laminar datastore.
+
+        Args:
+            layer: Layer the plan is for.
+            plan: Plan to write.
+        """
+
+        self._write(value=plan, uri=self.uri(path=Plan.path(layer=layer)), dtype=PlanProtocol.dtype)
+
     def _write(self, *, value: Any, uri: str, dtype: str) -> None:
         self.protocols.get(dtype, DEFAULT_SERDE).write(value, uri)
 
+    def _commit(self, *, value: Any, staged: BinaryIO, uri: str) -> None:
+        with fs.open(uri, "wb", compression="disable") as file, self.codec.compress(file) as stream:
+            shutil.copyfileobj(staged, stream)
+
     def write(self, *, layer: "Layer", name: str, values: Iterable[Any]) -> None:
         """Write to the laminar datastore.
 
@@ -401,8 +1196,40 @@ class DataStore:
             values : Artifact values to store.
         """
 
-        artifacts = [self.write_artifact(layer=layer, value=value) for value in values]
-        self.write_archive(layer=layer, name=name, artifacts=artifacts)
+        self.write_many(layer=layer, artifacts={name: values})
+
+    def write_many(
+        self, *, layer: "Layer", artifacts: builtins.dict[str, Iterable[Any]]
+    ) -> builtins.dict[str, Archive]:
+        """Write multiple artifacts to the laminar datastore at once.
+
+        Notes:
+            Artifacts are written concurrently, up to DataStore.concurrency at a time. Archives are written only after
+            every artifact has landed so that an archive never references a missing artifact.
+
+        Args:
+            layer: Layer being written to.
+            artifacts: Names of the artifacts being written mapped to the values to store.
+
+        Returns:
+            Archives written for each artifact name.
+        """
+
+        values = [(name, value) for name, sequence in artifacts.items() for value in sequence]
+        written = concurrency.imap(
+            lambda item: self.write_artifact(layer=layer, value=item[1]), values, concurrency=self.concurrency
+        )
+
+        grouped: builtins.dict[str, list[Artifact]] = {name: [] for name in artifacts}
+        for (name, _), artifact in zip(values, written):
+            grouped[name].append(artifact)
+
+        archives = concurrency.imap(
+            lambda item: self.write_archive(layer=layer, name=item[0], artifacts=item[1]),
+            grouped.items(),
+            concurrency=self.concurrency,
+        )
+        return dict(zip(grouped, archives))
 
     def list_executions(self, *, flow: "Flow") -> list["Execution"]:
         """List all executions.
@@ -453,27 +1280,117 @@ class DataStore:
             )
         )
 
+    def list_archives(self, *, layer: "Layer") -> builtins.dict[str, set[int]]:
+        """List the archives written by every split of a layer execution.
+
+        Notes:
+            Lists the layer's archive prefix once instead of listing each split separately.
+
+        Args:
+            layer: Layer to list archives for.
+
+        Returns:
+            Artifact names mapped to the splits that wrote an archive for them.
+        """
+
+        archives: builtins.dict[str, set[int]] = {}
+        prefix = self.uri(path=fs.join(layer.execution.flow.name, "archives", layer.execution.id, layer.name))
+        for split, name in self._list_archives(prefix=prefix):
+            archives.setdefault(name, set()).add(split)
+        return archives
+
+    def list_records(self, *, execution: "Execution") -> set[str]:
+        """List all layers with a record in an execution.
+
+        Notes:
+            Lists the execution's cache prefix once instead of checking each layer's record separately.
+
+        Args:
+            execution: Execution to list records for.
+
+        Returns:
+            Names of the layers with records.
+        """
+
+        return set(self._list_records(prefix=self.uri(path=fs.join(execution.flow.name, ".cache", execution.id))))
+
     def _list(self, *, prefix: str, group: str) -> Iterable[str]:
         raise NotImplementedError
 
+    def _list_records(self, *, prefix: str) -> Iterable[str]:
+        raise NotImplementedError
+
+    def _list_archives(self, *, prefix: str) -> Iterable[tuple[int, str]]:
+        raise NotImplementedError
+
+    def _list_metrics(self, *, prefix: str) -> Iterable[tuple[int, int]]:
+        raise NotImplementedError
+
 
 @dataclass(frozen=True)
 class Local(DataStore):
     """Store the laminar workspace on the local filesystem.
 
+    Notes:
+        Uncompressed artifacts are memory mapped copy-on-write when read with a protocol that implements
+        Protocol.view (e.g. serde.BytesProtocol, serde.NumpyProtocol), so large artifacts are not copied into memory.
+
     Usage::
 
         Flow(datastore=Local())
+        Flow(datastore=Local(codec=codecs.Codec()))
     """
 
     root: str = str(Path.cwd() / ".laminar")
 
+    def _load_artifact(self, *, uri: str, artifact: Artifact) -> tuple[Any, int | None]:
+        serializer = self.protocols.get(artifact.dtype, DEFAULT_SERDE)
+
+        if (
+            artifact.codec == codecs.Codec.name
+            and serde.overrides(serializer, "view")
+            and not serde.overrides(serializer, "read")
+        ):
+            buffer = fs.mapped(uri=uri)
+            return serializer.view(buffer), buffer.nbytes
+
+        return super()._load_artifact(uri=uri, artifact=artifact)
+
+    def _commit(self, *, value: Any, staged: BinaryIO, uri: str) -> None:
+        # Write beside the destination and rename so a partially written artifact is never mistaken for a
+        # committed one when deduplicating.
+        path = Path(uri)
+        temporary = path.with_name(f".{uuid.uuid4().hex}.{path.name}")
+        try:
+            super()._commit(value=value, staged=staged, uri=str(temporary))
+            os.replace(temporary, path)
+        finally:
+            temporary.unlink(missing_ok=True)
+
     def _list(self, *, prefix: str, group: str) -> Iterable[str]:
         for path in map(str, Path(prefix).glob("*")):
             match = ARCHIVE_PATTERN.match(path)
             if match is not None:
                 yield match.group(group)
 
+    def _list_records(self, *, prefix: str) -> Iterable[str]:
+        for path in map(str, Path(prefix).glob("*/.record.json")):
+            match = RECORD_PATTERN.match(path)
+            if match is not None:
+                yield match.group("layer")
+
+    def _list_archives(self, *, prefix: str) -> Iterable[tuple[int, str]]:
+        for path in map(str, Path(prefix).glob("*/*.json")):
+            match = ARCHIVE_PATTERN.match(path)
+            if match is not None and match.group("split") is not None:
+                yield int(match.group("split")), match.group("artifact")
+
+    def _list_metrics(self, *, prefix: str) -> Iterable[tuple[int, int]]:
+        for path in map(str, Path(prefix).glob("*/*.json")):
+            match = METRICS_PATTERN.match(path)
+            if match is not None:
+                yield int(match.group("split")), int(match.group("attempt"))
+
 
 @dataclass(frozen=True)
 class Memory(DataStore):
@@ -486,15 +1403,25 @@ class Memory(DataStore):
 
     root: str = "memory:///"
 
+    def __getstate__(self) -> builtins.dict[str, Any]:
+        # The cache is the workspace of a Memory datastore
+        return {**super().__getstate__(), "cache": self.cache}
+
     def exists(self, *, path: str) -> bool:
         return self.uri(path=path) in self.cache
 
     def _read(self, *, uri: str, dtype: str) -> Any:
         return self.cache[uri]
 
+    def _read_artifact(self, *, uri: str, artifact: Artifact) -> Any:
+        return self.cache[uri]
+
     def _write(self, *, value: Any, uri: str, dtype: str) -> None:
         self.cache[uri] = value
 
+    def _commit(self, *, value: Any, staged: BinaryIO, uri: str) -> None:
+        self.cache[uri] = value
+
     def _list(self, *, prefix: str, group: str) -> Iterable[str]:
         for path in self.cache:
             if path.startswith(prefix):
@@ -502,6 +1429,27 @@ class Memory(DataStore):
                 if match is not None:
                     yield match.group(group)
 
+    def _list_records(self, *, prefix: str) -> Iterable[str]:
+        for path in self.cache:
+            if path.startswith(f"{prefix}/"):
+                match = RECORD_PATTERN.match(path)
+                if match is not None:
+                    yield match.group("layer")
+
+    def _list_archives(self, *, prefix: str) -> Iterable[tuple[int, str]]:
+        for path in self.cache:
+            if path.startswith(f"{prefix}/"):
+                match = ARCHIVE_PATTERN.match(path)
+                if match is not None and match.group("split") is not None:
+                    yield int(match.group("split")), match.group("artifact")
+
+    def _list_metrics(self, *, prefix: str) -> Iterable[tuple[int, int]]:
+        for path in self.cache:
+            if path.startswith(f"{prefix}/"):
+                match = METRICS_PATTERN.match(path)
+                if match is not None:
+                    yield int(match.group("split")), int(match.group("attempt"))
+
 
 class AWS:
     @dataclass(frozen=True)
@@ -511,14 +1459,55 @@ class AWS:
         Usage::
 
             Flow(datastore=AWS.S3())
+            Flow(datastore=AWS.S3(disk=DiskCache()))
         """
 
-        def _list(self, *, prefix: str, group: str) -> Iterable[str]:
-            parts = fs.parse_uri(prefix)
+        #: Number of artifacts to read or write at once during bulk operations
+        concurrency: int = 16
+        #: Local disk cache to read artifacts through
+        disk: DiskCache | None = None
+
+        @contextmanager
+        def _open_artifact(self, *, uri: str, artifact: Artifact) -> Generator[BinaryIO, None, None]:
+            if self.disk is None:
+                with super()._open_artifact(uri=uri, artifact=artifact) as file:
+                    yield file
+            else:
+                with self.disk.open(uri=uri, artifact=artifact) as file:
+                    yield file
 
-            s3 = boto3.resource("s3")
-            bucket = s3.Bucket(name=parts.bucket_id)  # type: ignore[attr-defined]
-            for response in bucket.objects.filter(Prefix=parts.key_id):  # type: ignore[attr-defined]
-                match = ARCHIVE_PATTERN.match(response.key)
+        def _list(self, *, prefix: str, group: str) -> Iterable[str]:
+            for path in self._list_keys(prefix=prefix):
+                match = ARCHIVE_PATTERN.match(path)
                 if match is not None:
                     yield match.group(group)
+
+        def _list_records(self, *, prefix: str) -> Iterable[str]:
+            # List every record in one paginated listing instead of checking each layer's record
+            for path in self._list_keys(prefix=f"{prefix}/"):
+                match = RECORD_PATTERN.match(path)
+                if match is not None:
+                    yield match.group("layer")
+
+        def _list_archives(self, *, prefix: str) -> Iterable[tuple[int, str]]:
+            for path in self._list_keys(prefix=f"{prefix}/"):
+                match = ARCHIVE_PATTERN.match(path)
+                if match is not None and match.group("split") is not None:
+                    yield int(match.group("split")), match.group("artifact")
+
+        def _list_metrics(self, *, prefix: str) -> Iterable[tuple[int, int]]:
+            for path in self._list_keys(prefix=f"{prefix}/"):
+                match = METRICS_PATTERN.match(path)
+                if match is not None:
+                    yield int(match.group("split")), int(match.group("attempt"))
+
+        @staticmethod
+        def _list_keys(*, prefix: str) -> Iterable[str]:
+            parts = fs.parse_uri(prefix)
+            bucket, key = parts.bucket_id, parts.key_id  # type: ignore[attr-defined]
+
+            # The shared client is thread-safe, unlike resources created from the default session
+            paginator = fs.s3().get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=bucket, Prefix=key):
+                for response in page.get("Contents", []):
+                    yield f"{bucket}/{response['Key']}"
@@ -3,11 +3,16 @@
 import asyncio
 import hashlib
 import logging
+import multiprocessing
 import shlex
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 import boto3
+import cloudpickle
 from mypy_boto3_batch.type_defs import (
     ContainerOverridesTypeDef,
     ContainerPropertiesTypeDef,
@@ -15,15 +20,16 @@ from mypy_boto3_batch.type_defs import (
     KeyValuePairTypeDef,
 )
 
+from laminar import settings
 from laminar.exceptions import ExecutionError
-from laminar.utils import contexts
+from laminar.utils.concurrency import PrioritySemaphore
 
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from mypy_boto3_batch.client import BatchClient
 
-    from laminar import LayerRun
+    from laminar import Flow, LayerRun
 
 
 @dataclass(frozen=True)
@@ -36,13 +42,16 @@ class Executor:
     timeout: int = 86400
 
     @property
-    def semaphore(self) -> asyncio.Semaphore:
+    def semaphore(self) -> PrioritySemaphore:
         """Create a semaphore that limits asyncio concurrency.
 
         Notes:
 
             Concurrency is controled by Executor.concurrency
 
+            When layers are waiting on the semaphore, the layer with the highest critical path priority is admitted
+            first. See Graph.priorities().
+
         Usage::
 
             async with self.semaphore:
@@ -51,10 +60,46 @@ class Executor:
 
         attr = "_semaphore"
         if not hasattr(self, attr):
-            object.__setattr__(self, attr, asyncio.Semaphore(self.concurrency))
-        semaphore: asyncio.Semaphore = getattr(self, attr)
+            object.__setattr__(self, attr, PrioritySemaphore(self.concurrency))
+        semaphore: PrioritySemaphore = getattr(self, attr)
         return semaphore
 
+    def __getstate__(self) -> dict[str, Any]:
+        # Semaphores and pools are bound to the process that created them
+        return {key: value for key, value in self.__dict__.items() if not key.startswith("_")}
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[None]:
+        """Hold the resources layers are executed with for the duration of a scheduling loop.
+
+        Usage::
+
+            async with executor.session():
+                ...
+        """
+
+        yield
+
+    def environment(self, *, layer: "LayerRun") -> dict[str, str]:
+        """Get the execution environment variables of a layer.
+
+        Args:
+            layer: Layer to execute.
+
+        Returns:
+            Environment variable names mapped to their values.
+        """
+
+        return {
+            "LAMINAR_EXECUTION_ID": layer.execution.id,
+            "LAMINAR_EXECUTION_RETRY": str(layer.execution.retry),
+            "LAMINAR_FLOW_NAME": layer.execution.flow.name,
+            "LAMINAR_LAYER_ATTEMPT": str(layer.attempt),
+            "LAMINAR_LAYER_INDEX": str(layer.index),
+            "LAMINAR_LAYER_NAME": layer.name,
+            "LAMINAR_LAYER_SPLITS": str(layer.splits),
+        }
+
     async def submit(self, *, layer: "LayerRun") -> "LayerRun":
         """Execute a layer.
 
@@ -69,9 +114,10 @@ class Executor:
 class Thread(Executor):
     """Execute layers in local threads.
 
-    Note:
+    Notes:
 
-        Layers are always processed serially.
+        Up to Executor.concurrency layers execute at once, each in its own thread. The execution environment is set
+        with settings.environment() in the layer's context instead of through os.environ.
 
     Usage::
 
@@ -80,16 +126,71 @@ class Thread(Executor):
 
     async def submit(self, *, layer: "LayerRun") -> "LayerRun":
         async with self.semaphore:
-            with contexts.Environment(
-                LAMINAR_EXECUTION_ID=layer.execution.id,
-                LAMINAR_EXECUTION_RETRY=layer.execution.retry,
-                LAMINAR_FLOW_NAME=layer.execution.flow.name,
-                LAMINAR_LAYER_ATTEMPT=layer.attempt,
-                LAMINAR_LAYER_INDEX=layer.index,
-                LAMINAR_LAYER_NAME=layer.name,
-                LAMINAR_LAYER_SPLITS=layer.splits,
-            ):
-                layer.execution.execute(layer=layer)
+            # Threads copy the current context, so each layer sees only its own execution environment
+            with settings.environment(**self.environment(layer=layer)):
+                await asyncio.to_thread(layer.execution.execute, layer=layer)
+
+            return layer
+
+
+def _execute(payload: bytes, environment: dict[str, str]) -> None:
+    flow: Flow = cloudpickle.loads(payload)
+
+    # Select the layer to execute the same way a container does, from the execution environment
+    with settings.environment(**environment):
+        if flow._get_current_runtime() is None:
+            raise ExecutionError(f"Layer '{environment['LAMINAR_LAYER_NAME']}' is not registered to '{flow.name}'.")
+
+
+@dataclass(frozen=True)
+class Process(Executor):
+    """Execute layers in a pool of local processes.
+
+    Notes:
+
+        Up to Executor.concurrency layers execute at once, each in its own process. The flow is sent to the pool with
+        cloudpickle, so flows defined in __main__ can be executed, and the layer to execute is selected by an
+        execution environment passed along with the flow instead of through os.environ.
+
+        Worker processes are forked, so they must share the flow's datastore (e.g. Local or AWS.S3, not Memory).
+        Every worker is forked when the scheduling loop starts, before layers start any threads in the scheduling
+        process, and the pool is shut down when the loop ends. Layers submitted outside of a scheduling loop execute
+        in a pool of their own.
+
+    Usage::
+
+        Flow(executor=Process(concurrency=4))
+    """
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[None]:
+        pool = ProcessPoolExecutor(max_workers=self.concurrency, mp_context=multiprocessing.get_context("fork"))
+        object.__setattr__(self, "_pool", pool)
+
+        try:
+            # Forked pools start every worker on the first submission
+            await asyncio.get_running_loop().run_in_executor(pool, int)
+            yield
+        finally:
+            object.__delattr__(self, "_pool")
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Get the process pool of the current session that is shared by every layer submitted to the executor."""
+
+        pool: ProcessPoolExecutor = getattr(self, "_pool")
+        return pool
+
+    async def submit(self, *, layer: "LayerRun") -> "LayerRun":
+        if not hasattr(self, "_pool"):
+            async with self.session():
+                return await self.submit(layer=layer)
+
+        async with self.semaphore:
+            await asyncio.get_running_loop().run_in_executor(
+                self.pool, _execute, cloudpickle.dumps(layer.execution.flow), self.environment(layer=layer)
+            )
 
             return layer
 
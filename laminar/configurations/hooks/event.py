@@ -1,3 +1,4 @@
+import copy
 import inspect
 from contextlib import ExitStack, contextmanager
 from typing import TYPE_CHECKING, TypeVar
@@ -68,7 +69,13 @@ def context(*, layer: "Layer", annotation: str) -> ExitStack:
     """
 
     stack = ExitStack()
-    for hook in layer.hooks.get(annotation, []):
+    annotated = layer.hooks.get(annotation, [])
+
+    # Hooks may modify the layer configuration, so give the layer its own copy before they run
+    if annotated:
+        layer.configuration = copy.deepcopy(layer.configuration)
+
+    for hook in annotated:
         # Gather any layer dependencies the hook may have
         parameters = hints(layer.execution, hook)
 
@@ -10,7 +10,9 @@ from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 from laminar.configurations import datastores
+from laminar.exceptions import LayerError
 from laminar.settings import current
+from laminar.utils import concurrency
 
 if TYPE_CHECKING:
     from inspect import Traceback
@@ -70,6 +72,8 @@ class Container:
     memory: int = 1500
     #: Directory to execute the command in
     workdir: str = "/laminar"
+    #: Relative cost of executing a split of the layer, used to prioritize layers on the critical path
+    cost: float = 1.0
 
     def __post_init__(self) -> None:
         if not self.workdir.endswith(("://", ":///")):
@@ -98,12 +102,26 @@ class ForEach:
 
         If `Parameter(index=None)`, ForEach will include artifacts from all Layer splits.
 
+        If `mode="zip"`, ForEach pairs the values of each parameter by index instead of iterating over every
+        combination. Each parameter must have the same number of values.
+
+        If `batch_size > 1`, each split is assigned a contiguous batch of combinations and each parameter is an
+        Accessor over the batch's values.
+
     Usage::
 
         @Flow.register(foreach=ForEach(...))
     """
 
     parameters: Iterable[Parameter] = field(default_factory=list)  #: Parameters to configure the foreach with.
+    mode: str = "product"  #: How to combine parameters, either "product" or "zip".
+    batch_size: int = 1  #: Number of combinations to assign to each split.
+
+    def __post_init__(self) -> None:
+        if self.mode not in ("product", "zip"):
+            raise LayerError(f"ForEach mode must be 'product' or 'zip', got '{self.mode}'.")
+        if self.batch_size < 1:
+            raise LayerError(f"ForEach batch_size must be at least 1, got '{self.batch_size}'.")
 
     def join(self, *, layer: "LayerRun", name: str) -> datastores.Archive:
         """Join together multiple artifact splits of a layer into a single Archive.
@@ -117,6 +135,16 @@ class ForEach:
         """
 
         datastore = layer.execution.flow.configuration.datastore
+        splits = self.splits(layer=layer) if self.parameters else 1
+
+        # Only layers with multiple splits are compacted into a manifest
+        if splits > 1 and datastore.exists(path=datastores.Manifest.path(layer=layer)):
+            manifest = datastore.read_manifest(layer=layer)
+            if name in manifest.archives:
+                logger.debug("Manifest hit for layer '%s', archive '%s'.", layer.name, name)
+                return manifest.archives[name]
+            if name in manifest.missing:
+                raise FileNotFoundError(f"Archive '{name}' is missing from some splits of layer '{layer.name}'.")
 
         if datastore.exists(path=datastores.Archive.path(layer=layer, index=0, name=name, cache=True)):
             logger.debug("Cache hit for layer '%s', archive '%s'.", layer.name, name)
@@ -124,55 +152,175 @@ class ForEach:
 
         else:
             logger.debug("Cache miss for layer '%s', archive '%s'.", layer.name, name)
-            archives = [
-                datastore.read_archive(layer=layer, index=index, name=name)
-                for index in range(layer.configuration.foreach.splits(layer=layer))
-            ]
-            artifacts = list(itertools.chain.from_iterable([archive.artifacts for archive in archives]))
-
+            artifacts = self._gather(layer=layer, name=name, splits=splits)
             archive = datastore.write_archive(layer=layer, name=name, artifacts=artifacts, cache=True)
 
         return archive
 
-    def grid(self, *, layer: "LayerRun") -> list[dict["LayerRun", dict[str, int]]]:
-        """Generate a grid of all combinations of foreach inputs.
+    def compact(self, *, layer: "LayerRun", splits: int) -> datastores.Manifest:
+        """Compact the archives of every split of a layer into a single manifest.
+
+        Notes:
+            Splits can write different artifacts, e.g. attributes set conditionally or splits whose errors were
+            caught. Artifacts written by every split are joined, and the rest are recorded as missing.
 
         Args:
-            layer (Layer): Layer the ForEach is configured for.
+            layer: Layer to compact archives for.
+            splits: Number of splits the layer executed.
 
         Returns:
-            List[Dict[Layer, Dict[str, int]]]: Index ordered inputs of layers mapped to attributes mapped to Accessor
-                index.
+            Manifest written to the datastore.
+        """
+
+        datastore = layer.execution.flow.configuration.datastore
+
+        archives = datastore.list_archives(layer=layer)
+        joined = sorted(name for name, written in archives.items() if written.issuperset(range(splits)))
+
+        manifest = datastores.Manifest(
+            archives={
+                name: datastores.Archive(artifacts=self._gather(layer=layer, name=name, splits=splits))
+                for name in joined
+            },
+            missing=sorted(archives.keys() - set(joined)),
+        )
+        datastore.write_manifest(layer=layer, manifest=manifest)
+        return manifest
+
+    @staticmethod
+    def _gather(*, layer: "LayerRun", name: str, splits: int) -> list[datastores.Artifact]:
+        datastore = layer.execution.flow.configuration.datastore
+
+        # Split archives are small, so read them concurrently rather than one round trip at a time
+        archives = concurrency.imap(
+            lambda index: datastore.read_archive(layer=layer, index=index, name=name),
+            range(splits),
+            concurrency=datastore.concurrency,
+        )
+        return list(itertools.chain.from_iterable(archive.artifacts for archive in archives))
+
+    def archives(self, *, layer: "LayerRun") -> list[tuple["LayerRun", str, datastores.Archive]]:
+        """Get the archive of each foreach parameter.
+
+        Args:
+            layer: Layer the ForEach is configured for.
+
+        Returns:
+            Layer, attribute, and archive of each parameter.
         """
 
-        parameters: list[tuple[LayerRun, str]] = []
-        archives: list[datastores.Archive] = []
+        archives: list[tuple[LayerRun, str, datastores.Archive]] = []
 
         for parameter in self.parameters:
             instance = layer.execution.layer(parameter.layer)
-            parameters.append((instance, parameter.attribute))
 
             # Get archives for all layer splits.
             if parameter.index is None:
-                archives.append(instance.configuration.foreach.join(layer=instance, name=parameter.attribute))
+                archive = instance.configuration.foreach.join(layer=instance, name=parameter.attribute)
 
             # Get archive for specified layer index.
             else:
-                archives.append(
-                    instance.execution.flow.configuration.datastore.read_archive(
-                        layer=instance, index=parameter.index, name=parameter.attribute
-                    )
+                archive = instance.execution.flow.configuration.datastore.read_archive(
+                    layer=instance, index=parameter.index, name=parameter.attribute
                 )
 
-        # Compute the product of every possible set of parameter indexes based off of parameter layer splits.
-        grid: list[dict[LayerRun, dict[str, int]]] = []
-        for indexes in itertools.product(*(range(len(archive)) for archive in archives)):
-            model: dict[LayerRun, dict[str, int]] = {}
-            for (instance, attribute), index in zip(parameters, indexes):
-                model.setdefault(instance, {})[attribute] = index
-            grid.append(model)
+            archives.append((instance, parameter.attribute, archive))
+
+        return archives
 
-        return grid
+    def plan(self, *, layer: "LayerRun", cache: bool = True) -> datastores.Plan:
+        """Get the foreach plan shared by every split of a layer.
+
+        Args:
+            layer: Layer the ForEach is configured for.
+            cache: Read the plan written by the scheduler if there is one, instead of reading every parameter archive.
+
+        Returns:
+            Archive of each foreach parameter.
+        """
+
+        # Layers without a foreach don't have a plan to read
+        if not self.parameters:
+            return datastores.Plan(inputs=[])
+
+        datastore = layer.execution.flow.configuration.datastore
+
+        if cache and datastore.exists(path=datastores.Plan.path(layer=layer)):
+            logger.debug("Cache hit for layer '%s' plan.", layer.name)
+            return datastore.read_plan(layer=layer)
+
+        logger.debug("Cache miss for layer '%s' plan.", layer.name)
+        plan = datastores.Plan(
+            inputs=[
+                datastores.Plan.Input(layer=instance.name, attribute=attribute, archive=archive)
+                for instance, attribute, archive in self.archives(layer=layer)
+            ],
+            mode=self.mode,
+            batch_size=self.batch_size,
+        )
+
+        if plan.mode == "zip" and len(set(plan.shape)) > 1:
+            raise LayerError(
+                f"ForEach parameters of layer '{layer.name}' must have equal lengths to zip, got {plan.shape}."
+            )
+
+        return plan
+
+    def shape(self, *, layer: "LayerRun") -> tuple[int, ...]:
+        """Get the number of values of each foreach parameter.
+
+        Args:
+            layer: Layer the ForEach is configured for.
+
+        Returns:
+            Length of each parameter's archive.
+        """
+
+        return self.plan(layer=layer).shape
+
+    def grid(self, *, layer: "LayerRun") -> list[dict["LayerRun", dict[str, int]]]:
+        """Generate a grid of all combinations of foreach inputs.
+
+        Notes:
+            Materializes every combination. Use ForEach.coordinates() to get a single split's inputs.
+
+        Args:
+            layer (Layer): Layer the ForEach is configured for.
+
+        Returns:
+            List[Dict[Layer, Dict[str, int]]]: Index ordered inputs of layers mapped to attributes mapped to Accessor
+                index.
+        """
+
+        plan = self.plan(layer=layer)
+        return [self._inputs(layer=layer, plan=plan, index=index) for index in range(plan.size)]
+
+    def coordinates(self, *, layer: "LayerRun", index: int) -> dict["LayerRun", dict[str, int]]:
+        """Get the inputs of a single combination of the foreach grid without generating the grid.
+
+        Notes:
+            See Plan.indexes() for how combination indexes map to parameter indexes. Combinations are ordered the
+            same as ForEach.grid(), and each split is assigned a contiguous batch of them. See Plan.batch().
+
+        Args:
+            layer: Layer the ForEach is configured for.
+            index: Index of the combination.
+
+        Raises:
+            IndexError: If the index is outside of the grid.
+
+        Returns:
+            Inputs of layers mapped to attributes mapped to Accessor index.
+        """
+
+        return self._inputs(layer=layer, plan=self.plan(layer=layer), index=index)
+
+    @staticmethod
+    def _inputs(*, layer: "LayerRun", plan: datastores.Plan, index: int) -> dict["LayerRun", dict[str, int]]:
+        model: dict[LayerRun, dict[str, int]] = {}
+        for input, digit in zip(plan.inputs, plan.indexes(index)):
+            model.setdefault(layer.execution.layer(input.layer), {})[input.attribute] = digit
+        return model
 
     def splits(self, *, layer: "LayerRun") -> int:
         """Get the splits of the ForEach grid."""
@@ -183,7 +331,7 @@ class ForEach:
 
         else:
             logger.debug("Cache miss for layer '%s' record.", layer.name)
-            return len(self.grid(layer=layer))
+            return self.plan(layer=layer).splits
 
     def set(self, *, layer: "LayerRun", parameters: tuple["LayerRun", ...]) -> tuple["LayerRun", ...]:
         """Set a foreach layer's parameters given the inputs from the foreach grid.
@@ -196,14 +344,24 @@ class ForEach:
             Tuple[Layer, ...]: Parameters with modified values for the foreach evaluation.
         """
 
-        inputs = self.grid(layer=layer)[layer.index]
+        datastore = layer.execution.flow.configuration.datastore
+
+        # Read only this split's artifacts, as located by the plan
+        plan = self.plan(layer=layer)
+        batch = [plan.indexes(index) for index in plan.batch(layer.index)]
         for parameter in parameters:
-            for attribute, index in inputs.get(parameter, {}).items():
-                value = getattr(parameter, attribute)
+            for position, input in enumerate(plan.inputs):
+                if input.layer == parameter.name:
+                    archive = datastores.Archive(
+                        artifacts=[input.archive.artifacts[indexes[position]] for indexes in batch]
+                    )
 
-                # Index only if the requested attribute is an Accessor
-                value = value[index] if isinstance(value, datastores.Accessor) else value
-                setattr(parameter, attribute, value)
+                    # Batched splits get every value of the batch
+                    if plan.batch_size > 1:
+                        value = datastores.Accessor(archive=archive, layer=parameter, window=datastore.concurrency)
+                    else:
+                        value = datastore.read_artifact(layer=parameter, archive=archive)
+                    setattr(parameter, input.attribute, value)
 
         return parameters
 
@@ -278,9 +436,7 @@ class State:
 
     @property
     def finished(self) -> bool:
-        return self.layer.execution.flow.configuration.datastore.exists(
-            path=datastores.Record.path(layer=self.layer.execution.layer(self.layer))
-        )
+        return self.layer.name in self.layer.execution.records
 
     @property
     def running(self) -> bool:
@@ -4,13 +4,14 @@ import asyncio
 import functools
 import logging
 import operator
+import time
 from copy import deepcopy
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
 
 from laminar.configurations import datastores, hooks
 from laminar.exceptions import SchedulerError
-from laminar.utils import contexts
+from laminar.utils import concurrency, contexts
 
 if TYPE_CHECKING:
     from asyncio import Task
@@ -40,7 +41,13 @@ class Scheduler:
         tasks: list[Task[LayerRun]] = []
 
         try:
+            # Share the foreach plan with every split so that each split only reads its own artifacts
+            plan = layer.configuration.foreach.plan(layer=layer, cache=False)
+            if plan.inputs:
+                layer.execution.flow.configuration.datastore.write_plan(layer=layer, plan=plan)
+
             splits = layer.configuration.foreach.splits(layer=layer)
+            submitted = time.time()
 
             # Create a task per layer split
             for index in range(splits):
@@ -78,36 +85,28 @@ class Scheduler:
                 return await self.schedule(layer=layer, attempt=attempt + 1)
             raise
 
+        # Compact the split archives so that downstream joins read a single manifest. Joins fall back to reading
+        # each split, so a failed compaction never fails the layer. Compaction reads every split archive, so it runs
+        # in a thread to keep the scheduling loop responsive.
+        if splits > 1:
+            try:
+                await asyncio.to_thread(layer.configuration.foreach.compact, layer=layer, splits=splits)
+            except Exception:
+                logger.warning("Failed to compact layer '%s'.", layer.name, exc_info=True)
+
         # Cache the layer execution metadata
         layer.execution.flow.configuration.datastore.write_record(
             layer=layer,
             record=datastores.Record(
                 flow=datastores.Record.FlowRecord(name=layer.execution.flow.name),
                 layer=datastores.Record.LayerRecord(name=layer.name),
-                execution=datastores.Record.ExecutionRecord(splits=splits),
+                execution=datastores.Record.ExecutionRecord(splits=splits, submitted=submitted, finished=time.time()),
             ),
         )
+        layer.execution.records.add(layer.name)
 
         return list(layers)
 
-    def runnable(
-        self, *, dependencies: dict[str, set[str]], pending: set[str], finished: set[str]
-    ) -> tuple[set[str], set[str]]:
-        """Find all runnable layers.
-
-        Args:
-            dependencies: Layer dependencies
-            pending: Pending layers
-            finished: Finished layers
-
-        Returns:
-            * Remaining pending layers
-            * Runnable layers
-        """
-
-        runnable = {layer for layer in pending if dependencies[layer].issubset(finished)}
-        return pending - runnable, runnable
-
     def skippable(self, *, execution: "Execution", runnable: set[str], finished: set[str]) -> tuple[set[str], set[str]]:
         """Find all skippable layers.
 
@@ -146,51 +145,14 @@ class Scheduler:
             logger.info("Skipping layers: %s", sorted(skippable))
         return runnable - skippable, finished | skippable
 
-    def running(
-        self, *, execution: "Execution", runnable: set[str], running: set["Task[list[LayerRun]]"]
-    ) -> set["Task[list[LayerRun]]"]:
-        """Schedule runnable layers.
-
-        Args:
-
-            execution: Execution that the layers are being run in.
-            runnalbe: Runnable layers.
-            running: Currently running layers.
-
-        Returns:
-            Async tasks for new and existing running layers.
-        """
-
-        return running | {asyncio.create_task(self.schedule(layer=execution.layer(layer))) for layer in runnable}
-
-    async def wait(
-        self, *, running: set["Task[list[LayerRun]]"], finished: set[str], condition: str
-    ) -> tuple[set["Task[list[LayerRun]]"], set[str]]:
-        """Wait on the completion of running layers.
-
-        Args:
-            running: Running layers.
-            finished: Finished layers
-            condition: Condition to wait on.
-
-        Returns:
-            * Remaining running layers
-            * Finished layers
-        """
-
-        # Wait until the first task completes
-        completed, incomplete = await asyncio.wait(running, return_when=condition)
-
-        # Add all completed tasks to finished tasks
-        running = set(incomplete)
-        finished = finished | {(await task)[0].name for task in completed}
-
-        return running, finished
-
     @contexts.EventLoop
     async def loop(self, *, execution: "Execution", dependencies: dict[str, set[str]], finished: set[str]) -> None:
         """Run the scheduling loop.
 
+        Notes:
+            Tracks the number of unfinished dependencies of each pending layer. When a layer finishes, only its
+            dependents are updated, and each dependent is started as soon as its last dependency finishes.
+
         Args:
             execution: Flow execution to schedule.
             dependencies: Dependencies in the flow to schedule.
@@ -208,34 +170,84 @@ class Scheduler:
         logger.info("Dependencies: '%s'", dependencies)
 
         pending = set(dependencies) - finished
-        runnable: set[str] = set()
-        running: set[Task[list[LayerRun]]] = set()
-
-        # Start the scheduling loop
-        while pending:
-            logger.info("Pending layers: %s", sorted(pending))
-            pending, runnable = self.runnable(dependencies=dependencies, pending=pending, finished=finished)
-
-            # There are pending layers but nothing is runnable or running.
-            if not runnable and not running and pending:
-                raise SchedulerError(
-                    f"Stuck waiting to schedule: {sorted(pending)}."
-                    f" Finished layers: {sorted(finished)}."
-                    f" Remaining dependencies: { {task: sorted(dependencies[task]) for task in sorted(pending)} }"
-                )
-
-            logger.info("Runnable layers: %s", sorted(runnable))
-            runnable, finished = self.skippable(execution=execution, runnable=runnable, finished=finished)
-
-            running = self.running(execution=execution, runnable=runnable, running=running)
-
-            # Determine async task wait condition
-            condition = asyncio.FIRST_COMPLETED if pending else asyncio.ALL_COMPLETED
-
-            logger.info("Running layers: %s", sorted(set(dependencies) - pending - finished))
-            if running:
-                running, finished = await self.wait(running=running, finished=finished, condition=condition)
-            logger.info("Finished layers: %s", sorted(finished))
+        logger.info("Pending layers: %s", sorted(pending))
+
+        # Count each pending layer's unfinished dependencies and track which layers are waiting on each layer
+        waiting = {layer: len(dependencies[layer] - finished) for layer in pending}
+        dependents: dict[str, set[str]] = {}
+        for layer in pending:
+            for dependency in dependencies[layer] - finished:
+                dependents.setdefault(dependency, set()).add(layer)
+
+        # Prioritize layers on the critical path when they wait on the executor
+        priorities = execution.flow.graph.priorities(
+            {layer: execution.layer(layer).configuration.container.cost for layer in pending}
+        )
+
+        running: dict[Task[list[LayerRun]], str] = {}
+        completed: asyncio.Queue[Task[list[LayerRun]]] = asyncio.Queue()
+
+        def release(layers: set[str]) -> set[str]:
+            # Decrement the dependents of finished layers and return the ones with no dependencies left
+            runnable: set[str] = set()
+            for layer in layers:
+                for dependent in dependents.pop(layer, set()):
+                    waiting[dependent] -= 1
+                    if not waiting[dependent]:
+                        runnable.add(dependent)
+            return runnable
+
+        def start(runnable: set[str]) -> None:
+            nonlocal finished
+
+            while runnable:
+                logger.info("Runnable layers: %s", sorted(runnable))
+                pending.difference_update(runnable)
+
+                # Skipped layers finish immediately, which may release their dependents
+                runnable, updated = self.skippable(execution=execution, runnable=runnable, finished=finished)
+                skipped, finished = updated - finished, updated
+
+                for layer in runnable:
+                    # Tasks copy the current context when created, so each layer's splits inherit its priority
+                    token = concurrency.PRIORITY.set(priorities.get(layer, 0.0))
+                    task = asyncio.create_task(self.schedule(layer=execution.layer(layer)))
+                    concurrency.PRIORITY.reset(token)
+                    task.add_done_callback(completed.put_nowait)
+                    running[task] = layer
+
+                runnable = release(skipped)
+
+        # Layers are submitted to the executor within a single session of the scheduling loop
+        async with execution.flow.configuration.executor.session():
+            start({layer for layer in pending if not waiting[layer]})
+
+            # Start the scheduling loop
+            while running:
+                logger.info("Running layers: %s", sorted(running.values()))
+                task = await completed.get()
+                layer = running.pop(task)
+
+                try:
+                    task.result()
+                except BaseException:
+                    # Cancel and drain the other running layers so that they aren't abandoned running in the background.
+                    for other in running:
+                        other.cancel()
+                    await asyncio.gather(*running, return_exceptions=True)
+                    raise
+
+                finished = finished | {layer}
+                logger.info("Finished layers: %s", sorted(finished))
+                start(release({layer}))
+
+        # There are pending layers but nothing is runnable or running.
+        if pending:
+            raise SchedulerError(
+                f"Stuck waiting to schedule: {sorted(pending)}."
+                f" Finished layers: {sorted(finished)}."
+                f" Remaining dependencies: { {task: sorted(dependencies[task]) for task in sorted(pending)} }"
+            )
 
     def compile(self, *, execution: "Execution") -> dict[str, Any]:
         """Compile an intermediate representation of the Flow."""
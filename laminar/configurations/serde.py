@@ -1,7 +1,11 @@
 """Configurations for laminar serde."""
 
 import hashlib
-from typing import Any, BinaryIO, TypeVar
+import importlib
+import io
+import pickle
+import struct
+from typing import Any, BinaryIO, TypeVar, cast
 
 import cloudpickle
 
@@ -14,6 +18,34 @@ def dtype(cls: type) -> str:
     return f"{cls.__module__}.{cls.__name__}"
 
 
+def overrides(protocol: "Protocol", method: str) -> bool:
+    """Check if a protocol overrides one of the base Protocol methods."""
+
+    return getattr(type(protocol), method) is not getattr(Protocol, method)
+
+
+class Digest:
+    """Binary file wrapper that computes the SHA256 hexdigest of everything written through it.
+
+    Usage::
+
+        digest = Digest(file)
+        Protocol().dump(..., digest)
+        digest.hexdigest()
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.hash.update(data)
+        return self.file.write(data)
+
+    def hexdigest(self) -> str:
+        return self.hash.hexdigest()
+
+
 class MetaProtocol(type):
     @property
     def dtype(cls) -> str:
@@ -72,6 +104,26 @@ class Protocol(metaclass=MetaProtocol):
 
         raise NotImplementedError
 
+    def view(self, buffer: memoryview) -> Any:
+        """Deserialize a value from a memory mapped buffer without copying it.
+
+        Notes:
+            Only called for uncompressed artifacts on a Local datastore, and only if the protocol overrides it. The
+            buffer is mapped copy-on-write, so writes to it are never persisted.
+
+        Usage::
+
+            Protocol().view(memoryview(...))
+
+        Args:
+            buffer: View of the serialized bytes.
+
+        Returns:
+            Deserialized value.
+        """
+
+        raise NotImplementedError
+
     def write(self, value: Any, uri: str) -> None:
         """Write a value to a URI with a custom protocol.
 
@@ -126,6 +178,31 @@ class Protocol(metaclass=MetaProtocol):
 
         return hashlib.sha256(self.dumps(value)).hexdigest()
 
+    def stage(self, value: Any, file: BinaryIO) -> str:
+        """Serialize a value to a file and compute its hexdigest in a single pass.
+
+        Usage::
+
+            with tempfile.TemporaryFile() as file:
+                Protocol().stage(..., file)
+
+        Args:
+            value: Value to serialize.
+            file: File handler to write to.
+
+        Returns:
+            Hexdigest to use as the content address.
+        """
+
+        # A custom content address can't be derived from the serialized bytes
+        if overrides(self, "hexdigest"):
+            self.dump(value, file)
+            return self.hexdigest(value)
+
+        digest = Digest(file)
+        self.dump(value, cast(BinaryIO, digest))
+        return digest.hexdigest()
+
 
 ProtocolType = TypeVar("ProtocolType", bound=Protocol)
 
@@ -145,3 +222,198 @@ class PickleProtocol(Protocol):
     def dumps(self, value: Any) -> bytes:
         stream: bytes = cloudpickle.dumps(value)
         return stream
+
+
+class BufferProtocol(PickleProtocol):
+    """Custom protocol for serializing Python objects with large buffers using pickle protocol 5.
+
+    Notes:
+        Buffers larger than BufferProtocol.threshold (e.g. numpy arrays, Arrow buffers) are written out-of-band as raw
+        segments after the pickle stream instead of being copied into it. When reading an uncompressed artifact from a
+        Local datastore the segments are memory mapped copy-on-write, so large buffers are never copied into memory.
+
+        The file layout is a header of the magic bytes, the pickle length, and the number of segments, followed by the
+        length of each segment, the pickle stream, and each segment aligned to BufferProtocol.alignment bytes.
+
+    Usage::
+
+        datastore.protocol(numpy.ndarray)(serde.BufferProtocol)
+    """
+
+    magic = b"LAMINAR5"
+    header = struct.Struct("<8sQQ")
+    length = struct.Struct("<Q")
+
+    #: Buffers smaller than this many bytes are kept in the pickle stream
+    threshold: int = 64 * 1024
+    #: Byte alignment of out-of-band segments
+    alignment: int = 64
+
+    def load(self, file: BinaryIO) -> Any:
+        magic, size, count = self.header.unpack(self._read(file, self.header.size))
+        self._check(magic)
+        lengths = [self.length.unpack(self._read(file, self.length.size))[0] for _ in range(count)]
+        stream = self._read(file, size)
+
+        offset = self.header.size + self.length.size * count + size
+        buffers: list[bytearray] = []
+        for length in lengths:
+            self._read(file, self._padding(offset))
+            offset += self._padding(offset)
+            buffers.append(self._readinto(file, bytearray(length)))
+            offset += length
+
+        return pickle.loads(stream, buffers=buffers)
+
+    def loads(self, stream: bytes) -> Any:
+        return self.view(memoryview(bytearray(stream)))
+
+    def dump(self, value: Any, file: BinaryIO) -> None:
+        buffers: list[memoryview] = []
+
+        def callback(buffer: pickle.PickleBuffer) -> bool:
+            raw = buffer.raw()
+            if raw.nbytes < self.threshold:
+                return True
+            buffers.append(raw)
+            return False
+
+        stream = cloudpickle.dumps(value, protocol=5, buffer_callback=callback)
+
+        file.write(self.header.pack(self.magic, len(stream), len(buffers)))
+        for buffer in buffers:
+            file.write(self.length.pack(buffer.nbytes))
+        file.write(stream)
+
+        offset = self.header.size + self.length.size * len(buffers) + len(stream)
+        for buffer in buffers:
+            file.write(bytes(self._padding(offset)))
+            offset += self._padding(offset)
+            file.write(buffer)
+            offset += buffer.nbytes
+
+    def dumps(self, value: Any) -> bytes:
+        file = io.BytesIO()
+        self.dump(value, file)
+        return file.getvalue()
+
+    def view(self, buffer: memoryview) -> Any:
+        # NOTE: Out-of-band buffers are slices of the view, so they keep the underlying map open.
+        magic, size, count = self.header.unpack_from(buffer)
+        self._check(magic)
+
+        offset = self.header.size
+        lengths = []
+        for _ in range(count):
+            lengths.append(self.length.unpack_from(buffer, offset)[0])
+            offset += self.length.size
+        stream = buffer[offset : offset + size]
+        offset += size
+
+        buffers = []
+        for length in lengths:
+            offset += self._padding(offset)
+            buffers.append(buffer[offset : offset + length])
+            offset += length
+
+        return pickle.loads(stream, buffers=buffers)
+
+    def _padding(self, offset: int) -> int:
+        return -offset % self.alignment
+
+    def _check(self, magic: bytes) -> None:
+        if magic != self.magic:
+            raise ValueError(f"Artifact was not written by {type(self).__name__}.")
+
+    @staticmethod
+    def _read(file: BinaryIO, size: int) -> bytes:
+        data = file.read(size)
+        if len(data) != size:
+            raise EOFError(f"Expected '{size}' bytes but only read '{len(data)}'.")
+        return data
+
+    @staticmethod
+    def _readinto(file: BinaryIO, buffer: bytearray) -> bytearray:
+        # Decompressing streams may fill the buffer across multiple reads
+        view, position = memoryview(buffer), 0
+        while position < len(buffer):
+            read = file.readinto(view[position:])  # type: ignore[attr-defined]
+            if not read:
+                raise EOFError(f"Expected '{len(buffer)}' bytes but only read '{position}'.")
+            position += read
+        return buffer
+
+
+class BytesProtocol(Protocol):
+    """Custom protocol for storing raw bytes as is.
+
+    Notes:
+        Uncompressed artifacts on a Local datastore are read as a memoryview over the memory mapped file.
+
+    Usage::
+
+        datastore.protocol(bytes)(serde.BytesProtocol)
+    """
+
+    def load(self, file: BinaryIO) -> bytes:
+        return file.read()
+
+    def loads(self, stream: bytes) -> bytes:
+        return stream
+
+    def view(self, buffer: memoryview) -> memoryview:
+        return buffer
+
+    def dump(self, value: bytes, file: BinaryIO) -> None:
+        file.write(value)
+
+    def dumps(self, value: bytes) -> bytes:
+        return bytes(value)
+
+
+class NumpyProtocol(Protocol):
+    """Custom protocol for serializing numpy arrays in the .npy format.
+
+    Notes:
+        Requires the `numpy` package. Arrays with object dtypes are not supported. Uncompressed artifacts on a Local
+        datastore are read as an array over the memory mapped file.
+
+    Usage::
+
+        datastore.protocol(numpy.ndarray)(serde.NumpyProtocol)
+    """
+
+    def load(self, file: BinaryIO) -> Any:
+        numpy: Any = importlib.import_module("numpy")
+        return numpy.lib.format.read_array(file, allow_pickle=False)
+
+    def loads(self, stream: bytes) -> Any:
+        return self.load(io.BytesIO(stream))
+
+    def view(self, buffer: memoryview) -> Any:
+        numpy: Any = importlib.import_module("numpy")
+
+        # Only the header is copied to parse it, the array data is read straight from the buffer
+        major, _ = numpy.lib.format.read_magic(io.BytesIO(buffer[: numpy.lib.format.MAGIC_LEN]))
+        prefix = struct.Struct("<H" if major == 1 else "<I")
+        offset = numpy.lib.format.MAGIC_LEN + prefix.size + prefix.unpack_from(buffer, numpy.lib.format.MAGIC_LEN)[0]
+
+        header = io.BytesIO(buffer[:offset])
+        numpy.lib.format.read_magic(header)
+        if major == 1:
+            shape, fortran, dtype = numpy.lib.format.read_array_header_1_0(header)
+        else:
+            shape, fortran, dtype = numpy.lib.format.read_array_header_2_0(header)
+
+        count = int(numpy.prod(shape, dtype=numpy.int64))
+        array = numpy.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        return array.reshape(shape, order="F" if fortran else "C")
+
+    def dump(self, value: Any, file: BinaryIO) -> None:
+        numpy: Any = importlib.import_module("numpy")
+        numpy.lib.format.write_array(file, numpy.asanyarray(value), allow_pickle=False)
+
+    def dumps(self, value: Any) -> bytes:
+        file = io.BytesIO()
+        self.dump(value, file)
+        return file.getvalue()
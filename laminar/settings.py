@@ -1,11 +1,36 @@
 """Access for execution specific environment variables."""
 
 import os
+from collections.abc import Generator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+#: Execution environment variables that take precedence over os.environ
+ENVIRONMENT: ContextVar[Mapping[str, str]] = ContextVar("ENVIRONMENT", default={})
+
+
+@contextmanager
+def environment(**variables: Any) -> Generator[None, None, None]:
+    """Set execution environment variables for the current context without modifying os.environ.
+
+    Usage::
+
+        with settings.environment(LAMINAR_LAYER_NAME="A"):
+            current.layer.name
+    """
+
+    token = ENVIRONMENT.set({**ENVIRONMENT.get(), **{key: str(value) for key, value in variables.items()}})
+    try:
+        yield
+    finally:
+        ENVIRONMENT.reset(token)
 
 
 def get(prefix: str, attr: str) -> str | None:
     """Get environment variable."""
-    return os.environ.get(f"{prefix}{attr.upper()}")
+    name = f"{prefix}{attr.upper()}"
+    return ENVIRONMENT.get().get(name, os.environ.get(name))
 
 
 def coerce_bool(prefix: str, attr: str) -> bool:
@@ -2,12 +2,49 @@
 
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any, TypeVar, get_type_hints
+from weakref import WeakKeyDictionary
 
 if TYPE_CHECKING:
     from laminar import Execution, Layer
 
 T = TypeVar("T")
 
+#: Names of the layers each function's parameters are annotated with
+HINTS: WeakKeyDictionary[Callable[..., Any], tuple[str, ...]] = WeakKeyDictionary()
+
+
+def names(function: Callable[..., Any]) -> tuple[str, ...]:
+    """Get the names of the layers a function's parameters are annotated with.
+
+    Notes:
+        Type hints are resolved once per function. Bound methods share the hints of their underlying function.
+
+    Args:
+        function: Function to get the layer names for.
+
+    Returns:
+        Ordered layer names.
+    """
+
+    function = getattr(function, "__func__", function)
+
+    try:
+        return HINTS[function]
+    except KeyError:
+        pass
+    except TypeError:
+        # Callables that can't be weakly referenced are resolved every time
+        return _names(function)
+
+    HINTS[function] = result = _names(function)
+    return result
+
+
+def _names(function: Callable[..., Any]) -> tuple[str, ...]:
+    return tuple(
+        annotation.__name__ for parameter, annotation in get_type_hints(function).items() if parameter != "return"
+    )
+
 
 def hints(execution: "Execution", function: Callable[..., Any]) -> tuple["Layer", ...]:
     """Get the type hints for a given function.
@@ -20,10 +57,7 @@ def hints(execution: "Execution", function: Callable[..., Any]) -> tuple["Layer"
         Ordered type hints.
     """
 
-    return tuple(
-        execution.layer(hint)
-        for hint in (annotation for parameter, annotation in get_type_hints(function).items() if parameter != "return")
-    )
+    return tuple(execution.layer(name) for name in names(function))
 
 
 def unwrap(option: T | None, default: T | None = None) -> T:
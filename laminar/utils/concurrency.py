@@ -0,0 +1,119 @@
+"""Bounded concurrency helpers."""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+#: Priority of the current task when waiting on a PrioritySemaphore
+PRIORITY: ContextVar[float] = ContextVar("PRIORITY", default=0.0)
+
+
+def imap(function: Callable[[T], R], items: Iterable[T], *, concurrency: int) -> Iterator[R]:
+    """Lazily apply a function to items in a thread pool, yielding results in order.
+
+    Notes:
+        At most `concurrency` items are in flight at once, so a slow consumer never buffers the whole input. Each item
+        runs in a copy of the caller's context, so context variables set by the caller are visible to the function.
+
+    Usage::
+
+        for value in concurrency.imap(read, uris, concurrency=8):
+            ...
+
+    Args:
+        function: Function to apply to each item.
+        items: Items to apply the function to.
+        concurrency: Maximum number of items to process at once.
+
+    Returns:
+        Results of the function in the order of the items.
+    """
+
+    if concurrency <= 1:
+        yield from map(function, items)
+        return
+
+    futures: deque[Future[R]] = deque()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        try:
+            for item in items:
+                futures.append(pool.submit(contextvars.copy_context().run, function, item))
+                if len(futures) >= concurrency:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            # Don't start queued work once the consumer has stopped or a result has failed
+            for future in futures:
+                future.cancel()
+
+
+class PrioritySemaphore:
+    """Semaphore that admits the highest priority waiter first.
+
+    Notes:
+        The priority of a waiter is read from PRIORITY when it starts waiting. Waiters with equal priority are
+        admitted in the order they started waiting.
+
+    Usage::
+
+        semaphore = concurrency.PrioritySemaphore(4)
+
+        token = concurrency.PRIORITY.set(10.0)
+        async with semaphore:
+            ...
+    """
+
+    def __init__(self, value: int = 1) -> None:
+        self._value = value
+        self._waiters: list[tuple[float, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+
+    def locked(self) -> bool:
+        """Check if the semaphore can't be acquired immediately."""
+
+        return self._value == 0 or any(not future.done() for _, _, future in self._waiters)
+
+    async def acquire(self) -> None:
+        """Acquire the semaphore, waiting behind any higher priority waiters."""
+
+        if not self.locked():
+            self._value -= 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-PRIORITY.get(), next(self._counter), future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Admitted while being cancelled, so pass the admission on to the next waiter
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Release the semaphore to the highest priority waiter."""
+
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+
+        self._value += 1
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *_: Any) -> None:
+        self.release()
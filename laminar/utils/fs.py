@@ -1,34 +1,62 @@
+import builtins
+import mmap
 import os
+import threading
+from collections.abc import Iterable
 from contextlib import contextmanager
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, BinaryIO, TextIO, overload
 
+import boto3
 import smart_open
+from botocore.exceptions import ClientError
+
+from laminar.utils.concurrency import imap
 
 if TYPE_CHECKING:
     from typing import Literal
 
 parse_uri = smart_open.parse_uri
 
+_clients: dict[tuple[str, int], Any] = {}
+_lock = threading.Lock()
+
+
+def s3() -> Any:
+    """Get an S3 client shared by every thread in this process.
+
+    Notes:
+        Clients are thread-safe once created but creating them from the default session is not, and they can't be
+        shared with forked processes.
+    """
+
+    key = ("s3", os.getpid())
+    with _lock:
+        if key not in _clients:
+            _clients[key] = boto3.session.Session().client("s3")
+        return _clients[key]
+
 
 @overload
-def open(uri: str, mode: "Literal['r']") -> TextIO: ...
+def open(uri: str, mode: "Literal['r']", *, compression: str = ...) -> TextIO: ...
 
 
 @overload
-def open(uri: str, mode: "Literal['rb']") -> BinaryIO: ...
+def open(uri: str, mode: "Literal['rb']", *, compression: str = ...) -> BinaryIO: ...
 
 
 @overload
-def open(uri: str, mode: "Literal['w']") -> TextIO: ...
+def open(uri: str, mode: "Literal['w']", *, compression: str = ...) -> TextIO: ...
 
 
 @overload
-def open(uri: str, mode: "Literal['wb']") -> BinaryIO: ...
+def open(uri: str, mode: "Literal['wb']", *, compression: str = ...) -> BinaryIO: ...
 
 
 @contextmanager  # type: ignore
-def open(uri: str, mode: "Literal['r', 'rb', 'w', 'wb']") -> BinaryIO | TextIO:  # type: ignore
+def open(  # type: ignore
+    uri: str, mode: "Literal['r', 'rb', 'w', 'wb']", *, compression: str = "infer_from_extension"
+) -> BinaryIO | TextIO:
     """Open a file handler to a local or remote file.
 
     Usage::
@@ -41,6 +69,8 @@ def open(uri: str, mode: "Literal['r', 'rb', 'w', 'wb']") -> BinaryIO | TextIO:
     Args:
         uri: URI to the file to open.
         mode: Mode to open the file with.
+        compression: Compression to apply, inferred from the file extension by default. "disable" to read and write
+            the raw bytes.
 
     Returns:
         Union[BinaryIO, TextIO]: File handle to the local/remote file.
@@ -49,7 +79,8 @@ def open(uri: str, mode: "Literal['r', 'rb', 'w', 'wb']") -> BinaryIO | TextIO:
     if parse_uri(uri).scheme == "file" and "w" in mode:  # type: ignore[attr-defined]
         Path(uri).parent.mkdir(parents=True, exist_ok=True)
 
-    with smart_open.open(uri, mode) as file:
+    transport_params = {"client": s3()} if parse_uri(uri).scheme == "s3" else None  # type: ignore[attr-defined]
+    with smart_open.open(uri, mode, compression=compression, transport_params=transport_params) as file:
         yield file
 
 
@@ -68,6 +99,19 @@ def exists(*, uri: str) -> bool:
         bool: True if the file exists, else False.
     """
 
+    parts = parse_uri(uri)
+
+    # Check metadata only instead of opening the file
+    if parts.scheme == "file":  # type: ignore[attr-defined]
+        return os.path.isfile(parts.uri_path)  # type: ignore[attr-defined]
+
+    if parts.scheme == "s3":  # type: ignore[attr-defined]
+        try:
+            s3().head_object(Bucket=parts.bucket_id, Key=parts.key_id)  # type: ignore[attr-defined]
+            return True
+        except ClientError:
+            return False
+
     try:
         with open(uri, "rb"):
             return True
@@ -75,6 +119,48 @@ def exists(*, uri: str) -> bool:
         return False
 
 
+def exists_many(*, uris: Iterable[str], concurrency: int = 1) -> list[bool]:
+    """Check for the existance of multiple local/remote files at once.
+
+    Usage::
+
+        fs.exists_many(uris=["s3://...", "s3://..."], concurrency=16)
+
+    Args:
+        uris: URIs to the files to check.
+        concurrency: Number of files to check at once.
+
+    Returns:
+        True for each file that exists, else False.
+    """
+
+    return list(imap(lambda uri: exists(uri=uri), uris, concurrency=concurrency))
+
+
+def mapped(*, uri: str) -> memoryview:
+    """Memory map a local file copy-on-write.
+
+    Notes:
+        Writes to the returned view are private to the process and never reach the file.
+
+    Usage::
+
+        fs.mapped(uri="/...")
+
+    Args:
+        uri: URI to the local file to map.
+
+    Returns:
+        View of the file's bytes.
+    """
+
+    with builtins.open(parse_uri(uri).uri_path, "rb") as file:  # type: ignore[attr-defined]
+        # Empty files can't be mapped
+        if os.fstat(file.fileno()).st_size == 0:
+            return memoryview(bytearray())
+        return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY))
+
+
 def join(*parts: Any) -> str:
     """Join parts into a path
 
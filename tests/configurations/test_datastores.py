@@ -1,39 +1,252 @@
 """Tests for laminar.configurations.datastores"""
 
+import copy
+import gzip
 import hashlib
 import io
 import json
+import os
+import threading
+from collections.abc import Generator
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, cast
 from unittest.mock import Mock, call, mock_open, patch
 
 import cloudpickle
 import pytest
 
-from laminar.configurations import serde
-from laminar.configurations.datastores import Accessor, Archive, Artifact, DataStore, Local, Record
+from laminar import Layer
+from laminar.configurations import codecs, serde
+from laminar.configurations.datastores import (
+    AWS,
+    LRU,
+    WRITTEN,
+    Accessor,
+    Archive,
+    Artifact,
+    Counter,
+    DataStore,
+    DiskCache,
+    Local,
+    Manifest,
+    Memory,
+    Metrics,
+    Plan,
+    Record,
+    Statistics,
+    Summary,
+)
 
 if TYPE_CHECKING:
-    from pathlib import Path
+    from laminar import Flow
 
-    from laminar import Layer
+
+def cloudpickle_hexdigest(value: Any) -> str:
+    return hashlib.sha256(cloudpickle.dumps(value)).hexdigest()
+
+
+def written(mock_open: Mock) -> bytes:
+    return b"".join(bytes(args[0]) for args, _ in mock_open.return_value.write.call_args_list)
+
+
+class TestStatistics:
+    def test_count(self) -> None:
+        statistics = Statistics()
+        statistics.hit()
+        statistics.hit()
+        statistics.miss()
+
+        assert statistics == Statistics(hits=2, misses=1)
+
+    def test_copy(self) -> None:
+        statistics = Statistics(hits=1)
+
+        assert copy.deepcopy(statistics) == statistics
+        assert cloudpickle.loads(cloudpickle.dumps(statistics)) == statistics
+
+
+class TestCounter:
+    def test_add(self) -> None:
+        counter = Counter()
+        counter.add(2)
+        counter.add(3)
+
+        assert counter == Counter(total=5)
+        assert cloudpickle.loads(cloudpickle.dumps(counter)) == counter
+
+
+class TestMetrics:
+    def test_path(self, layer: "Layer") -> None:
+        assert Metrics.path(layer=layer, index=1, attempt=2) == "TestFlow/metrics/test-execution/Layer/1/2.json"
+
+    def test_parse(self) -> None:
+        metrics = Metrics(attempt=1, started=1.0, finished=3.5, serialization=0.5, written=10)
+
+        assert Metrics.parse(metrics.dict()) == metrics
+        assert metrics.duration == 2.5
+
+
+class TestSummary:
+    def test_build(self) -> None:
+        assert Summary.build(float(value) for value in range(100, 0, -1)) == Summary(
+            count=100, p50=50.0, p95=95.0, max=100.0
+        )
+        assert Summary.build([2.0]) == Summary(count=1, p50=2.0, p95=2.0, max=2.0)
+
+    def test_empty(self) -> None:
+        with pytest.raises(ValueError):
+            Summary.build([])
+
+
+class TestLRU:
+    def test_get_put(self) -> None:
+        lru = LRU(capacity=10)
+
+        assert lru.get("foo") == (False, None)
+        lru.put("foo", "value", 4)
+        assert lru.get("foo") == (True, "value")
+
+        assert (len(lru), lru.size) == (1, 4)
+        assert lru.statistics == Statistics(hits=1, misses=1)
+
+    def test_evict(self) -> None:
+        lru = LRU(capacity=10)
+        lru.put("foo", 1, 4)
+        lru.put("bar", 2, 4)
+
+        # Reading foo makes bar the least recently used
+        lru.get("foo")
+        lru.put("baz", 3, 4)
+
+        assert lru.get("bar") == (False, None)
+        assert lru.get("foo") == (True, 1)
+        assert (len(lru), lru.size, lru.evictions) == (2, 8, 1)
+
+    def test_oversized(self) -> None:
+        lru = LRU(capacity=10)
+        lru.put("foo", 1, 11)
+
+        assert len(lru) == 0
+
+    def test_replace(self) -> None:
+        lru = LRU(capacity=10)
+        lru.put("foo", 1, 4)
+        lru.put("foo", 2, 6)
+
+        assert lru.get("foo") == (True, 2)
+        assert lru.size == 6
+
+    def test_copy(self) -> None:
+        lru = LRU(capacity=10)
+        lru.put("foo", 1, 4)
+
+        # Cached values stay in the process they were read in
+        for other in (copy.deepcopy(lru), cloudpickle.loads(cloudpickle.dumps(lru))):
+            assert (other.capacity, len(other), other.get("foo")) == (10, 0, (False, None))
+
+
+class TestDiskCache:
+    @pytest.fixture(autouse=True)
+    def _cache(self, tmp_path: Path) -> None:
+        self.cache = DiskCache(directory=str(tmp_path / "cache"), capacity=10)
+        self.remote = tmp_path / "remote"
+        self.remote.mkdir()
+
+    def artifact(self, hexdigest: str, data: bytes) -> Artifact:
+        (self.remote / hexdigest).write_bytes(data)
+        return Artifact(dtype="bytes", hexdigest=hexdigest, codec="none")
+
+    def read(self, artifact: Artifact) -> bytes:
+        with self.cache.open(uri=str(self.remote / artifact.hexdigest), artifact=artifact) as file:
+            return file.read()
+
+    def test_read_through(self) -> None:
+        artifact = self.artifact("foo", b"abc")
+
+        assert self.read(artifact) == b"abc"
+        (self.remote / "foo").unlink()
+        assert self.read(artifact) == b"abc"
+
+        assert self.cache.statistics == Statistics(hits=1, misses=1)
+        assert [path.name for path in Path(self.cache.directory).iterdir()] == ["foo"]
+
+    def test_failed_download(self) -> None:
+        with pytest.raises(FileNotFoundError):
+            self.read(Artifact(dtype="bytes", hexdigest="missing", codec="none"))
+
+        # Partial downloads are never left behind
+        assert list(Path(self.cache.directory).iterdir()) == []
+
+    def test_evict(self) -> None:
+        foo, bar = self.artifact("foo", b"1234"), self.artifact("bar", b"1234")
+        self.read(foo)
+        self.read(bar)
+        os.utime(self.cache.path(artifact=foo), (0, 0))
+        os.utime(self.cache.path(artifact=bar), (1, 1))
+
+        # Reading foo makes bar the least recently read
+        self.read(foo)
+        assert self.read(self.artifact("baz", b"1234")) == b"1234"
+
+        assert sorted(path.name for path in Path(self.cache.directory).iterdir()) == ["baz", "foo"]
+
+    def test_evict_running_total(self) -> None:
+        with patch.object(DiskCache, "evict", autospec=True, side_effect=DiskCache.evict) as mock_evict:
+            # The first download scans the directory, later downloads within capacity don't
+            self.read(self.artifact("foo", b"1234"))
+            self.read(self.artifact("bar", b"1234"))
+            assert mock_evict.call_count == 1
+
+            # Going past capacity evicts down to the target
+            self.read(self.artifact("baz", b"1234"))
+            assert mock_evict.call_count == 2
+
+        assert len(list(Path(self.cache.directory).iterdir())) == 2
+
+    def test_copy(self) -> None:
+        self.read(self.artifact("foo", b"1234"))
+
+        copied = cloudpickle.loads(cloudpickle.dumps(self.cache))
+        assert copied == self.cache
+
+    def test_s3(self, layer: "Layer", tmp_path: Path) -> None:
+        artifact = Local(root=str(tmp_path / "root")).write_artifact(layer=layer, value=[True, False])
+
+        cache = DiskCache(directory=str(tmp_path / "cache"))
+        datastore = AWS.S3(root=str(tmp_path / "root"), disk=cache, lru=LRU(capacity=0))
+        archive = Archive(artifacts=[artifact])
+
+        assert datastore.read_artifact(layer=layer, archive=archive) == [True, False]
+        assert datastore.read_artifact(layer=layer, archive=archive) == [True, False]
+        assert cache.statistics == Statistics(hits=1, misses=1)
+        assert (
+            cache.path(artifact=artifact).read_bytes() == (tmp_path / "root" / artifact.path(layer=layer)).read_bytes()
+        )
 
 
 class TestArtifact:
     artifact = Artifact(dtype="str", hexdigest="foo")
 
     def test_dict(self) -> None:
-        assert self.artifact.dict() == {"dtype": "str", "hexdigest": "foo"}
+        assert self.artifact.dict() == {"dtype": "str", "hexdigest": "foo", "codec": "gzip"}
 
     def test_path(self, layer: "Layer") -> None:
         assert self.artifact.path(layer=layer) == f"{layer.execution.flow.name}/artifacts/foo.gz"
 
+    def test_path_codec(self, layer: "Layer") -> None:
+        assert Artifact(dtype="str", hexdigest="foo", codec="none").path(layer=layer) == "TestFlow/artifacts/foo"
+        assert Artifact(dtype="str", hexdigest="foo", codec="zstd").path(layer=layer) == "TestFlow/artifacts/foo.zst"
+
 
 class TestArchive:
     archive = Archive(artifacts=[Artifact(dtype="str", hexdigest="foo"), Artifact(dtype="str", hexdigest="bar")])
 
     def test_dict(self) -> None:
         assert self.archive.dict() == {
-            "artifacts": [{"dtype": "str", "hexdigest": "foo"}, {"dtype": "str", "hexdigest": "bar"}]
+            "artifacts": [
+                {"dtype": "str", "hexdigest": "foo", "codec": "gzip"},
+                {"dtype": "str", "hexdigest": "bar", "codec": "gzip"},
+            ]
         }
 
     def test_len(self) -> None:
@@ -50,9 +263,20 @@ class TestArchive:
         )
 
     def test_parse(self) -> None:
-        expected = {"artifacts": [{"dtype": "str", "hexdigest": "foo"}, {"dtype": "str", "hexdigest": "bar"}]}
+        expected = {
+            "artifacts": [
+                {"dtype": "str", "hexdigest": "foo", "codec": "gzip"},
+                {"dtype": "str", "hexdigest": "bar", "codec": "none"},
+            ]
+        }
         assert Archive.parse(expected).dict() == expected
 
+    def test_parse_legacy(self) -> None:
+        # Archives written before codecs were recorded are all gzipped
+        assert Archive.parse({"artifacts": [{"dtype": "str", "hexdigest": "foo"}]}) == Archive(
+            artifacts=[Artifact(dtype="str", hexdigest="foo", codec="gzip")]
+        )
+
 
 class TestAccessor:
     @pytest.fixture(autouse=True)
@@ -86,6 +310,17 @@ class TestAccessor:
     def test_slice(self) -> None:
         assert self.accessor[:1] == ["foo"]
 
+    def test_read_many(self) -> None:
+        assert self.accessor.read_many([1, 0, 1]) == ["bar", "foo", "bar"]
+
+    def test_prefetch(self) -> None:
+        accessor = self.accessor.prefetch(4)
+
+        assert accessor.window == 4
+        assert list(accessor) == ["foo", "bar"]
+        assert accessor[::-1] == ["bar", "foo"]
+        assert accessor.read_many([1]) == ["bar"]
+
     def test_index_out_of_bounds(self) -> None:
         with pytest.raises(IndexError):
             self.accessor[10]
@@ -106,6 +341,12 @@ class TestDatastore:
     def _datastore(self) -> None:
         self.datastore = DataStore(root="path/to/root/")
 
+    @pytest.fixture(autouse=True)
+    def _exists(self) -> Generator[None, None, None]:
+        # fs.open is mocked in most tests, which would otherwise make every artifact look like it already exists.
+        with patch("laminar.utils.fs.exists", return_value=False):
+            yield
+
     @pytest.fixture(autouse=True)
     def _record(self) -> None:
         self.record = Record(
@@ -143,7 +384,7 @@ class TestDatastore:
 
     @patch("laminar.utils.fs.open")
     def test_read_artifact(self, mock_open: Mock, layer: "Layer") -> None:
-        mock_open.return_value = io.BytesIO(cloudpickle.dumps("test-value"))
+        mock_open.return_value = io.BytesIO(gzip.compress(cloudpickle.dumps("test-value")))
 
         assert (
             self.datastore.read_artifact(
@@ -152,29 +393,74 @@ class TestDatastore:
             == "test-value"
         )
 
-        mock_open.assert_called_once_with("path/to/root/TestFlow/artifacts/foo.gz", "rb")
+        mock_open.assert_called_once_with("path/to/root/TestFlow/artifacts/foo.gz", "rb", compression="disable")
+
+    @patch("laminar.utils.fs.open")
+    def test_read_artifact_codec(self, mock_open: Mock, layer: "Layer") -> None:
+        mock_open.return_value = io.BytesIO(cloudpickle.dumps("test-value"))
+
+        assert (
+            self.datastore.read_artifact(
+                layer=layer, archive=Archive(artifacts=[Artifact(dtype="str", hexdigest="foo", codec="none")])
+            )
+            == "test-value"
+        )
+
+        mock_open.assert_called_once_with("path/to/root/TestFlow/artifacts/foo", "rb", compression="disable")
+
+    @patch("laminar.utils.fs.open")
+    def test_read_artifact_lru(self, mock_open: Mock, layer: "Layer") -> None:
+        stream = cloudpickle.dumps("test-value")
+        mock_open.side_effect = lambda *args, **kwargs: io.BytesIO(gzip.compress(stream))
+        archive = Archive(artifacts=[Artifact(dtype="str", hexdigest="foo")])
+        datastore = DataStore(root="path/to/root/", lru=LRU(capacity=1024))
+
+        first = datastore.read_artifact(layer=layer, archive=archive)
+        second = datastore.read_artifact(layer=layer, archive=archive)
+
+        # The second read is served from memory and sized by the uncompressed stream
+        assert first is second
+        mock_open.assert_called_once()
+        assert datastore.lru.statistics == Statistics(hits=1, misses=1)
+        assert datastore.lru.size == len(stream)
+
+    @patch("laminar.utils.fs.open")
+    def test_read_artifact_lru_disabled(self, mock_open: Mock, layer: "Layer") -> None:
+        mock_open.side_effect = lambda *args, **kwargs: io.BytesIO(gzip.compress(cloudpickle.dumps("test-value")))
+        # The cache is opt-in since cached values are shared by every reader
+        datastore = DataStore(root="path/to/root/")
+        archive = Archive(artifacts=[Artifact(dtype="str", hexdigest="foo")])
+
+        datastore.read_artifact(layer=layer, archive=archive)
+        datastore.read_artifact(layer=layer, archive=archive)
+
+        assert mock_open.call_count == 2
 
     def test_read_artifact_accessor(self, layer: "Layer") -> None:
         assert self.datastore.read_artifact(layer=layer, archive=self.archive) == Accessor(
             archive=self.archive, layer=layer
         )
 
+    def test_read_artifact_accessor_window(self, layer: "Layer") -> None:
+        datastore = DataStore(root="path/to/root/", concurrency=8)
+
+        assert datastore.read_artifact(layer=layer, archive=self.archive).window == 8
+
+    @patch("laminar.configurations.datastores.DataStore._read_artifact")
     @patch("laminar.configurations.datastores.DataStore._read")
-    def test_read(self, mock_read: Mock, layer: "Layer") -> None:
+    def test_read(self, mock_read: Mock, mock_read_artifact: Mock, layer: "Layer") -> None:
         mock_read.return_value.__len__.return_value = 1
 
         self.datastore.read(layer=layer, index=0, name="test")
 
-        assert mock_read.call_args_list == [
-            call(
-                uri="path/to/root/TestFlow/archives/test-execution/Layer/0/test.json",
-                dtype="laminar.configurations.datastores.ArchiveProtocol",
-            ),
-            call(
-                uri=self.datastore.uri(path=mock_read.return_value.artifacts[0].path.return_value),
-                dtype=mock_read.return_value.artifacts[0].dtype,
-            ),
-        ]
+        mock_read.assert_called_once_with(
+            uri="path/to/root/TestFlow/archives/test-execution/Layer/0/test.json",
+            dtype="laminar.configurations.datastores.ArchiveProtocol",
+        )
+        mock_read_artifact.assert_called_once_with(
+            uri=self.datastore.uri(path=mock_read.return_value.artifacts[0].path.return_value),
+            artifact=mock_read.return_value.artifacts[0],
+        )
 
     @patch("laminar.utils.fs.open", new_callable=mock_open)
     def test_write_archive(self, mock_open: Mock, layer: "Layer") -> None:
@@ -187,7 +473,8 @@ class TestDatastore:
             "path/to/root/TestFlow/archives/test-execution/Layer/0/test-archive.json", "wb"
         )
         mock_open.return_value.write.assert_called_once_with(
-            b'{"artifacts": [{"dtype": "str", "hexdigest": "foo"}, {"dtype": "str", "hexdigest": "bar"}]}'
+            b'{"artifacts": [{"dtype": "str", "hexdigest": "foo", "codec": "gzip"},'
+            b' {"dtype": "str", "hexdigest": "bar", "codec": "gzip"}]}'
         )
 
     @patch("laminar.utils.fs.open", new_callable=mock_open)
@@ -197,7 +484,28 @@ class TestDatastore:
         )
 
         mock_open.assert_called_once_with(
-            "path/to/root/TestFlow/artifacts/7d3d5dd741934c11ce55c08d83052780db2f29438238f602afbd51b177a98b7f.gz", "wb"
+            "path/to/root/TestFlow/artifacts/7d3d5dd741934c11ce55c08d83052780db2f29438238f602afbd51b177a98b7f.gz",
+            "wb",
+            compression="disable",
+        )
+        assert (
+            gzip.decompress(written(mock_open)) == b"\x80\x05\x95\x0e\x00\x00\x00\x00\x00\x00\x00\x8c\ntest-value\x94."
+        )
+
+    @patch("laminar.utils.fs.open", new_callable=mock_open)
+    def test_write_artifact_codec(self, mock_open: Mock, layer: "Layer") -> None:
+        datastore = DataStore(root="path/to/root/", codec=codecs.Codec())
+
+        assert datastore.write_artifact(layer=layer, value="test-value") == Artifact(
+            dtype="builtins.str",
+            hexdigest="7d3d5dd741934c11ce55c08d83052780db2f29438238f602afbd51b177a98b7f",
+            codec="none",
+        )
+
+        mock_open.assert_called_once_with(
+            "path/to/root/TestFlow/artifacts/7d3d5dd741934c11ce55c08d83052780db2f29438238f602afbd51b177a98b7f",
+            "wb",
+            compression="disable",
         )
         mock_open.return_value.write.assert_called_once_with(
             b"\x80\x05\x95\x0e\x00\x00\x00\x00\x00\x00\x00\x8c\ntest-value\x94."
@@ -216,21 +524,70 @@ class TestDatastore:
         # The hexdigest must be computed with the custom protocol's bytes, not the default
         # pickle-derived bytes, or the content hash won't match what's actually written to disk.
         assert artifact == Artifact(dtype="builtins.str", hexdigest=hashlib.sha256(b"TEST-VALUE").hexdigest())
-        mock_open.return_value.write.assert_called_once_with(b"TEST-VALUE")
+        assert gzip.decompress(written(mock_open)) == b"TEST-VALUE"
+
+    @patch("laminar.utils.fs.open", new_callable=mock_open)
+    def test_write_artifact_serializes_once(self, mock_open: Mock, layer: "Layer") -> None:
+        calls: list[Any] = []
+
+        class CountingProtocol(serde.Protocol):
+            def dumps(self, value: Any) -> bytes:
+                calls.append(value)
+                return cast(str, value).encode()
+
+        self.datastore.protocol(str)(CountingProtocol)
+
+        artifact = self.datastore.write_artifact(layer=layer, value="test-value")
+
+        assert calls == ["test-value"]
+        assert artifact == Artifact(dtype="builtins.str", hexdigest=hashlib.sha256(b"test-value").hexdigest())
+
+    @patch("laminar.utils.fs.open", new_callable=mock_open)
+    def test_write_artifact_custom_write(self, mock_open: Mock, layer: "Layer") -> None:
+        written: dict[str, Any] = {}
+
+        class DirectProtocol(serde.Protocol):
+            def dumps(self, value: Any) -> bytes:
+                return cast(str, value).encode()
+
+            def write(self, value: Any, uri: str) -> None:
+                written[uri] = value
+
+        self.datastore.protocol(str)(DirectProtocol)
+
+        artifact = self.datastore.write_artifact(layer=layer, value="test-value")
+
+        assert written == {self.datastore.uri(path=artifact.path(layer=layer)): "test-value"}
+        mock_open.assert_not_called()
+
+    @patch("laminar.configurations.datastores.DataStore._commit")
+    def test_write_artifact_deduplicate(self, mock_commit: Mock, layer: "Layer") -> None:
+        first = self.datastore.write_artifact(layer=layer, value="test-value")
+        second = self.datastore.write_artifact(layer=layer, value="test-value")
+
+        assert first == second
+        mock_commit.assert_called_once()
+        assert self.datastore.deduplication == Statistics(hits=1, misses=1)
+
+    @patch("laminar.configurations.datastores.DataStore._commit")
+    def test_write_artifact_deduplicate_existing(self, mock_commit: Mock, layer: "Layer") -> None:
+        with patch("laminar.utils.fs.exists", return_value=True):
+            self.datastore.write_artifact(layer=layer, value="test-value")
+
+        mock_commit.assert_not_called()
+        assert self.datastore.deduplication == Statistics(hits=1, misses=0)
 
     @patch("laminar.configurations.datastores.DataStore._write")
-    def test_write(self, mock_write: Mock, layer: "Layer") -> None:
+    @patch("laminar.configurations.datastores.DataStore._commit")
+    def test_write(self, mock_commit: Mock, mock_write: Mock, layer: "Layer") -> None:
         self.datastore.write(layer=layer, name="test-artifact", values=[True])
 
+        mock_commit.assert_called_once()
+        assert mock_commit.call_args.kwargs["value"] is True
+        assert mock_commit.call_args.kwargs["uri"] == (
+            "path/to/root/TestFlow/artifacts/5280fce43ea9afbd61ec2c2a16c35118af29eafa08aa2f5f714e54dc9cceb5ae.gz"
+        )
         assert mock_write.call_args_list == [
-            call(
-                value=True,
-                uri=(
-                    "path/to/root/TestFlow/artifacts/"
-                    "5280fce43ea9afbd61ec2c2a16c35118af29eafa08aa2f5f714e54dc9cceb5ae.gz"
-                ),
-                dtype="builtins.bool",
-            ),
             call(
                 value=Archive(
                     artifacts=[
@@ -259,15 +616,259 @@ class TestDatastore:
 
         mock_write.assert_called_once_with("path/to/root/TestFlow/.cache/test-execution/Layer/.record.json", "wb")
         mock_write.return_value.write.assert_called_once_with(
-            b'{"flow": {"name": "test-flow"}, "layer": {"name": "test-layer"}, "execution": {"splits": 2}}'
+            b'{"flow": {"name": "test-flow"}, "layer": {"name": "test-layer"},'
+            b' "execution": {"splits": 2, "submitted": null, "finished": null}}'
+        )
+
+    def test_plan(self, layer: "Layer") -> None:
+        plan = Plan(
+            inputs=[
+                Plan.Input(
+                    layer="A", attribute="foo", archive=Archive(artifacts=[Artifact("str", "1"), Artifact("str", "2")])
+                )
+            ]
+        )
+        assert plan.shape == (2,)
+
+        buffer = io.BytesIO()
+        with patch("laminar.utils.fs.open", new_callable=mock_open) as mock_write:
+            mock_write.return_value.write.side_effect = buffer.write
+            self.datastore.write_plan(layer=layer, plan=plan)
+
+        mock_write.assert_called_once_with("path/to/root/TestFlow/.cache/test-execution/Layer/.plan.json", "wb")
+
+        with patch("laminar.utils.fs.open", return_value=io.BytesIO(buffer.getvalue())):
+            assert self.datastore.read_plan(layer=layer) == plan
+
+    def test_manifest(self, layer: "Layer") -> None:
+        manifest = Manifest(archives={"foo": Archive(artifacts=[Artifact("str", "1"), Artifact("str", "2")])})
+
+        buffer = io.BytesIO()
+        with patch("laminar.utils.fs.open", new_callable=mock_open) as mock_write:
+            mock_write.return_value.write.side_effect = buffer.write
+            self.datastore.write_manifest(layer=layer, manifest=manifest)
+
+        mock_write.assert_called_once_with("path/to/root/TestFlow/.cache/test-execution/Layer/.manifest.json", "wb")
+
+        with patch("laminar.utils.fs.open", return_value=io.BytesIO(buffer.getvalue())):
+            assert self.datastore.read_manifest(layer=layer) == manifest
+
+    def test_exists_many(self) -> None:
+        with patch.object(DataStore, "exists", autospec=True, side_effect=lambda self, *, path: path == "b"):
+            assert DataStore(root="path/to/root/", concurrency=2).exists_many(paths=["a", "b", "c"]) == [
+                False,
+                True,
+                False,
+            ]
+
+    @patch("laminar.utils.fs.s3")
+    def test_list_records_s3(self, mock_s3: Mock, layer: "Layer") -> None:
+        mock_s3.return_value.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": "root/TestFlow/.cache/test-execution/A/.record.json"}]},
+            {"Contents": [{"Key": "root/TestFlow/.cache/test-execution/B/.record.json"}]},
+            {"Contents": [{"Key": "root/TestFlow/.cache/test-execution/B/0/.plan.json"}]},
+        ]
+        datastore = AWS.S3(root="s3://bucket/root")
+
+        assert datastore.list_records(execution=layer.execution) == {"A", "B"}
+        mock_s3.return_value.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket="bucket", Prefix="root/TestFlow/.cache/test-execution/"
+        )
+
+    @patch("laminar.utils.fs.s3")
+    def test_read_metrics_s3(self, mock_s3: Mock, layer: "Layer") -> None:
+        mock_s3.return_value.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": "root/TestFlow/metrics/test-execution/Layer/1/1.json"}]},
+            {"Contents": [{"Key": "root/TestFlow/metrics/test-execution/Layer/0/2.json"}]},
+            {"Contents": [{"Key": "root/TestFlow/metrics/test-execution/Layer/0/1.json"}]},
+        ]
+        datastore = AWS.S3(root="s3://bucket/root")
+
+        with patch.object(AWS.S3, "_read", autospec=True, side_effect=lambda self, *, uri, dtype: uri) as mock_read:
+            # Only the last attempt of each split is read by default
+            assert cast(list[Any], datastore.read_metrics(layer=layer)) == [
+                "s3://bucket/root/TestFlow/metrics/test-execution/Layer/0/2.json",
+                "s3://bucket/root/TestFlow/metrics/test-execution/Layer/1/1.json",
+            ]
+            assert len(datastore.read_metrics(layer=layer, attempts=True)) == 3
+
+        assert mock_read.call_count == 5
+        mock_s3.return_value.get_paginator.return_value.paginate.assert_called_with(
+            Bucket="bucket", Prefix="root/TestFlow/metrics/test-execution/Layer/"
+        )
+
+    @patch("laminar.utils.fs.s3")
+    def test_list_archives_s3(self, mock_s3: Mock, layer: "Layer") -> None:
+        mock_s3.return_value.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": "root/TestFlow/archives/test-execution/Layer/0/foo.json"}]},
+            {"Contents": [{"Key": "root/TestFlow/archives/test-execution/Layer/1/foo.json"}]},
+            {"Contents": [{"Key": "root/TestFlow/archives/test-execution/Layer/1/bar.json"}]},
+        ]
+        datastore = AWS.S3(root="s3://bucket/root")
+
+        assert datastore.list_archives(layer=layer) == {"foo": {0, 1}, "bar": {1}}
+        mock_s3.return_value.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket="bucket", Prefix="root/TestFlow/archives/test-execution/Layer/"
         )
 
 
 class TestLocal:
     @pytest.fixture(autouse=True)
-    def _datastore(self, tmp_path: "Path") -> None:
+    def _datastore(self, tmp_path: Path) -> None:
         self.datastore = Local(root=str(tmp_path))
 
     def test_read_write(self, layer: "Layer") -> None:
         self.datastore.write(layer=layer, name="test", values=[[True, False]])
         assert self.datastore.read(layer=layer, index=0, name="test") == [True, False]
+
+    def test_write_deduplicate(self, layer: "Layer", tmp_path: Path) -> None:
+        self.datastore.write(layer=layer, name="test", values=[[True, False]])
+
+        # A fresh datastore has no in-process knowledge and must find the existing artifact itself
+        datastore = Local(root=str(tmp_path))
+        datastore.write(layer=layer, name="test", values=[[True, False]])
+
+        assert datastore.deduplication == Statistics(hits=1, misses=0)
+        assert [path.name for path in (tmp_path / "TestFlow" / "artifacts").iterdir()] == [
+            f"{cloudpickle_hexdigest([True, False])}.gz"
+        ]
+
+    def test_list_archives(self, layer: "Layer") -> None:
+        self.datastore.write(layer=layer, name="foo", values=[1])
+        self.datastore.write(layer=layer, name="bar", values=[2])
+
+        assert self.datastore.list_archives(layer=layer) == {"foo": {0}, "bar": {0}}
+
+    def test_copy(self, layer: "Layer") -> None:
+        self.datastore.write(layer=layer, name="test", values=[[True, False]])
+
+        # Process local caches aren't sent to other processes
+        copied = cloudpickle.loads(cloudpickle.dumps(self.datastore))
+        assert copied.root == self.datastore.root
+        assert self.datastore.committed
+        assert copied.committed == set()
+        assert copied.read(layer=layer, index=0, name="test") == [True, False]
+
+    def test_copy_memory(self, layer: "Layer") -> None:
+        datastore = Memory()
+        datastore.write(layer=layer, name="test", values=[[True, False]])
+
+        # The cache is the workspace of a Memory datastore, so it is kept
+        copied = cloudpickle.loads(cloudpickle.dumps(datastore))
+        assert copied.committed == set()
+        assert copied.read(layer=layer, index=0, name="test") == [True, False]
+
+    def test_write_many(self, layer: "Layer", tmp_path: Path) -> None:
+        datastore = Local(root=str(tmp_path), concurrency=4)
+        archives = datastore.write_many(layer=layer, artifacts={"foo": [1, 2, 3], "bar": ["a"]})
+
+        assert list(archives) == ["foo", "bar"]
+        assert [
+            datastore.read_artifact(layer=layer, archive=Archive(artifacts=[artifact]))
+            for artifact in datastore.read_archive(layer=layer, index=0, name="foo").artifacts
+        ] == [1, 2, 3]
+        assert datastore.read(layer=layer, index=0, name="bar") == "a"
+
+    def test_write_many_failure(self, layer: "Layer", tmp_path: Path) -> None:
+        datastore = Local(root=str(tmp_path), concurrency=4)
+        write_artifact = Local.write_artifact
+
+        def fail(self: Local, *, layer: "Layer", value: Any) -> Artifact:
+            if value == 2:
+                raise RuntimeError
+            return write_artifact(self, layer=layer, value=value)
+
+        with patch.object(Local, "write_artifact", autospec=True, side_effect=fail), pytest.raises(RuntimeError):
+            datastore.write_many(layer=layer, artifacts={"foo": [1, 2, 3]})
+
+        # No archive may reference artifacts that never landed
+        assert not (tmp_path / "TestFlow" / "archives").exists()
+
+    def test_write_many_written(self, layer: "Layer", tmp_path: Path) -> None:
+        datastore = Local(root=str(tmp_path), concurrency=4)
+
+        written = Counter()
+        token = WRITTEN.set(written)
+        try:
+            # Writes from other contexts, e.g. layers executing concurrently, aren't counted
+            other = threading.Thread(
+                target=datastore.write_many, kwargs={"layer": layer, "artifacts": {"bar": [b"c" * 1000]}}
+            )
+            other.start()
+            datastore.write_many(layer=layer, artifacts={"foo": [b"a" * 10, b"b" * 10]})
+            other.join()
+        finally:
+            WRITTEN.reset(token)
+
+        assert 20 <= written.total < 1000
+
+    @pytest.mark.parametrize(
+        "codec", [codecs.Codec(), codecs.Gzip(level=1), codecs.Zstd(), codecs.LZ4()], ids=lambda codec: codec.name
+    )
+    def test_codec(self, codec: codecs.Codec, layer: "Layer", tmp_path: Path) -> None:
+        if codec.name in ("zstd", "lz4"):
+            pytest.importorskip({"zstd": "zstandard", "lz4": "lz4"}[codec.name])
+
+        datastore = Local(root=str(tmp_path), codec=codec)
+        artifact = datastore.write_artifact(layer=layer, value=[True, False])
+
+        assert artifact.codec == codec.name
+        assert (tmp_path / artifact.path(layer=layer)).exists()
+        assert datastore.read_artifact(layer=layer, archive=Archive(artifacts=[artifact])) == [True, False]
+
+    def test_codec_coexist(self, layer: "Layer", tmp_path: Path) -> None:
+        gzipped = Local(root=str(tmp_path)).write_artifact(layer=layer, value="foo")
+        raw = Local(root=str(tmp_path), codec=codecs.Codec()).write_artifact(layer=layer, value="foo")
+
+        # Reads are decoded by the codec recorded in each artifact, not the datastore's current codec
+        datastore = Local(root=str(tmp_path), codec=codecs.Codec())
+        assert gzipped.path(layer=layer) != raw.path(layer=layer)
+        assert datastore.read_artifact(layer=layer, archive=Archive(artifacts=[gzipped])) == "foo"
+        assert datastore.read_artifact(layer=layer, archive=Archive(artifacts=[raw])) == "foo"
+
+    def test_buffer_protocol(self, layer: "Layer", tmp_path: Path) -> None:
+        numpy = pytest.importorskip("numpy")
+
+        datastore = Local(root=str(tmp_path), codec=codecs.Codec())
+        datastore.protocol(numpy.ndarray)(serde.BufferProtocol)
+
+        array = numpy.arange(100_000, dtype="int64")
+        artifact = datastore.write_artifact(layer=layer, value=array)
+        loaded = datastore.read_artifact(layer=layer, archive=Archive(artifacts=[artifact]))
+
+        # Uncompressed local artifacts are memory mapped rather than copied into memory
+        assert not loaded.flags.owndata
+        numpy.testing.assert_array_equal(loaded, array)
+
+    @pytest.mark.parametrize("codec", [codecs.Codec(), codecs.Gzip()], ids=lambda codec: codec.name)
+    def test_mapped(self, codec: codecs.Codec, layer: "Layer", tmp_path: Path) -> None:
+        datastore = Local(root=str(tmp_path), codec=codec)
+        datastore.protocol(bytes)(serde.BytesProtocol)
+
+        artifact = datastore.write_artifact(layer=layer, value=b"foo")
+        loaded = datastore.read_artifact(layer=layer, archive=Archive(artifacts=[artifact]))
+
+        # Only uncompressed artifacts can be memory mapped
+        assert isinstance(loaded, memoryview if codec.name == codecs.Codec.name else bytes)
+        assert bytes(loaded) == b"foo"
+
+    def test_list_records(self, flow: "Flow") -> None:
+        @flow.register
+        class A(Layer): ...
+
+        @flow.register
+        class B(Layer): ...
+
+        execution = flow.execution("test-execution")
+        for layer in (A, B):
+            self.datastore.write_record(
+                layer=execution.layer(layer),
+                record=Record(
+                    flow=Record.FlowRecord(name=flow.name),
+                    layer=Record.LayerRecord(name=layer.__name__),
+                    execution=Record.ExecutionRecord(splits=1),
+                ),
+            )
+
+        assert self.datastore.list_records(execution=execution) == {"A", "B"}
+        assert self.datastore.list_records(execution=flow.execution("other-execution")) == set()
@@ -2,19 +2,23 @@
 
 import asyncio
 import hashlib
+import os
 import re
 import shlex
-from typing import TYPE_CHECKING, Any
+import threading
+from pathlib import Path
+from typing import Any
 from unittest.mock import AsyncMock, Mock, patch
 
+import cloudpickle
 import pytest
 
-from laminar import Layer, LayerRun
-from laminar.configurations.executors import Docker, Executor, Thread
+from laminar import Flow, Layer, LayerRun
+from laminar.configurations.datastores import Local
+from laminar.configurations.executors import Docker, Executor, Process, Thread
 from laminar.exceptions import ExecutionError
-
-if TYPE_CHECKING:
-    from laminar import Flow
+from laminar.settings import current
+from laminar.utils.concurrency import PrioritySemaphore
 
 
 @pytest.mark.asyncio
@@ -23,7 +27,8 @@ class TestExecutor:
 
     async def test_sempahore(self) -> None:
         assert self.executor.semaphore._value == 1
-        assert self.executor.semaphore != asyncio.Semaphore(1)
+        assert self.executor.semaphore != PrioritySemaphore(1)
+        assert self.executor.semaphore is self.executor.semaphore
 
     async def test_submit(self, layer: "LayerRun") -> None:
         with pytest.raises(NotImplementedError):
@@ -41,6 +46,81 @@ class TestThread:
 
         mock_layer.execution.execute.assert_called_once_with(layer=mock_layer)
 
+    async def test_submit_concurrent(self, flow: Flow) -> None:
+        barrier = threading.Barrier(2, timeout=5)
+
+        class Base(Layer):
+            def __call__(self) -> None:
+                # Both layers must be running at once to pass the barrier
+                barrier.wait()
+                self.environ = os.environ.get("LAMINAR_LAYER_NAME")
+                self.current = current.layer.name
+
+        A: type[Base] = flow.register(type("A", (Base,), {}))
+        B: type[Base] = flow.register(type("B", (Base,), {}))
+
+        executor = Thread(concurrency=2)
+        await asyncio.gather(*(executor.submit(layer=flow.test_execution.layer(layer)) for layer in (A, B)))
+
+        for layer in (A, B):
+            result = flow.test_execution.layer(layer)
+            assert result.environ is None
+            assert result.current == layer.__name__
+
+
+@pytest.mark.asyncio
+class TestProcess:
+    async def test_submit(self, tmp_path: Path) -> None:
+        class ProcessFlow(Flow): ...
+
+        @ProcessFlow.register
+        class A(Layer):
+            def __call__(self) -> None:
+                self.pid = os.getpid()
+                self.environ = os.environ.get("LAMINAR_LAYER_NAME")
+                self.current = current.layer.name, current.layer.attempt
+
+        flow = ProcessFlow(datastore=Local(root=str(tmp_path)), executor=Process(concurrency=2))
+        layer = flow.execution("test-execution").layer(A, attempt=2)
+
+        assert await flow.configuration.executor.submit(layer=layer) == layer
+
+        # The layer ran in another process with its execution environment passed explicitly
+        result = flow.execution("test-execution").layer(A)
+        assert result.pid != os.getpid()
+        assert result.environ is None
+        assert result.current == ("A", 2)
+
+    async def test_submit_error(self, tmp_path: Path) -> None:
+        class ProcessFlow(Flow): ...
+
+        @ProcessFlow.register
+        class A(Layer):
+            def __call__(self) -> None:
+                raise RuntimeError("boom")
+
+        flow = ProcessFlow(datastore=Local(root=str(tmp_path)), executor=Process())
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await flow.configuration.executor.submit(layer=flow.execution("test-execution").layer(A))
+
+    async def test_session(self) -> None:
+        executor = Process(concurrency=2)
+
+        async with executor.session():
+            pool = executor.pool
+
+            # Every worker is forked up front
+            assert len(pool._processes) == 2
+
+            assert cloudpickle.loads(cloudpickle.dumps(executor)) == executor
+            assert not hasattr(cloudpickle.loads(cloudpickle.dumps(executor)), "_pool")
+
+        # The pool is shut down when the session ends
+        assert not hasattr(executor, "_pool")
+        with pytest.raises(RuntimeError):
+            pool.submit(int)
+
 
 @pytest.mark.asyncio
 class TestDocker:
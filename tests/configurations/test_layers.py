@@ -5,8 +5,10 @@ from typing import Any
 import pytest
 
 from laminar import Flow, Layer
-from laminar.configurations.datastores import Archive, Artifact, Record
+from laminar.configurations.datastores import Accessor, Archive, Artifact, Manifest, Memory, Plan, Record
+from laminar.configurations.executors import Thread
 from laminar.configurations.layers import Catch, ForEach, Parameter
+from laminar.exceptions import LayerError
 
 
 class TestCatch:
@@ -25,7 +27,7 @@ class TestCatch:
 
         TestFlow.register(catch=catch)(A)
         TestFlow.register(catch=catch)(B)
-        execution = TestFlow().execution("test")
+        execution = TestFlow(datastore=Memory(), executor=Thread()).execution("test")
         execution.layer(A).execute()
         execution.layer(B).execute()
 
@@ -38,7 +40,7 @@ class TestCatch:
 
         TestFlow.register(A)
         with pytest.raises(RuntimeError):
-            TestFlow().execution("test").layer(A).execute()
+            TestFlow(datastore=Memory(), executor=Thread()).execution("test").layer(A).execute()
 
     def test_suberror(self) -> None:
         class A(Layer):
@@ -48,7 +50,7 @@ class TestCatch:
         class TestFlow(Flow): ...
 
         TestFlow.register(catch=Catch(Exception))(A)
-        TestFlow().execution("test").layer(A).execute()
+        TestFlow(datastore=Memory(), executor=Thread()).execution("test").layer(A).execute()
 
 
 class TestForEach:
@@ -96,10 +98,35 @@ class TestForEach:
         @self.flow.register(foreach=ForEach(parameters=[Parameter(layer=C, attribute="foo", index=None)]))
         class D(Layer): ...
 
+        @self.flow.register(
+            foreach=ForEach(
+                parameters=[Parameter(layer=A, attribute="foo"), Parameter(layer=B, attribute="bar")], mode="zip"
+            )
+        )
+        class E(Layer): ...
+
+        @self.flow.register(
+            foreach=ForEach(
+                parameters=[Parameter(layer=A, attribute="foo"), Parameter(layer=C, attribute="foo", index=None)],
+                mode="zip",
+            )
+        )
+        class F(Layer): ...
+
+        @self.flow.register(
+            foreach=ForEach(
+                parameters=[Parameter(layer=A, attribute="foo"), Parameter(layer=B, attribute="bar")], batch_size=3
+            )
+        )
+        class G(Layer): ...
+
         self.A = A
         self.B = B
         self.C = C
         self.D = D
+        self.E = E
+        self.F = F
+        self.G = G
 
     def test_join(self) -> None:
         layer = self.execution.layer(self.C)
@@ -112,6 +139,59 @@ class TestForEach:
             ]
         )
 
+    def test_join_manifest(self) -> None:
+        archive = Archive(artifacts=[Artifact(dtype="str", hexdigest="z")])
+        self.flow.configuration.datastore.cache["memory:///TestFlow/.cache/test-execution/C/.manifest.json"] = Manifest(
+            archives={"foo": archive}
+        )
+
+        layer = self.execution.layer(self.C)
+        assert layer.configuration.foreach.join(layer=layer, name="foo") == archive
+
+    def test_join_manifest_single_split(self) -> None:
+        self.flow.configuration.datastore.cache["memory:///TestFlow/.cache/test-execution/A/.manifest.json"] = Manifest(
+            archives={"foo": Archive(artifacts=[])}
+        )
+
+        # Layers with a single split are never compacted, so the manifest is not checked
+        layer = self.execution.layer(self.A)
+        assert layer.configuration.foreach.join(layer=layer, name="foo") == Archive(
+            artifacts=[Artifact(dtype="str", hexdigest="1"), Artifact(dtype="str", hexdigest="2")]
+        )
+
+    def test_compact(self) -> None:
+        layer = self.execution.layer(self.C)
+        manifest = layer.configuration.foreach.compact(layer=layer, splits=4)
+
+        assert manifest == Manifest(
+            archives={
+                "foo": Archive(
+                    artifacts=[
+                        Artifact(dtype="str", hexdigest="a"),
+                        Artifact(dtype="str", hexdigest="b"),
+                        Artifact(dtype="str", hexdigest="c"),
+                        Artifact(dtype="str", hexdigest="d"),
+                    ]
+                )
+            }
+        )
+        assert self.flow.configuration.datastore.read_manifest(layer=layer) == manifest
+
+    def test_compact_missing(self) -> None:
+        workspace = self.flow.configuration.datastore.cache
+        workspace["memory:///TestFlow/archives/test-execution/C/0/bar.json"] = Archive(artifacts=[])
+        workspace["memory:///TestFlow/archives/test-execution/C/2/bar.json"] = Archive(artifacts=[])
+        workspace["memory:///TestFlow/archives/test-execution/C/3/baz.json"] = Archive(artifacts=[])
+
+        # Artifacts written by only some splits are recorded as missing instead of failing the compaction
+        layer = self.execution.layer(self.C)
+        manifest = layer.configuration.foreach.compact(layer=layer, splits=4)
+        assert list(manifest.archives) == ["foo"]
+        assert manifest.missing == ["bar", "baz"]
+
+        with pytest.raises(FileNotFoundError):
+            layer.configuration.foreach.join(layer=layer, name="bar")
+
     def test_grid(self) -> None:
         layer = self.execution.layer(self.C)
         assert layer.configuration.foreach.grid(layer=layer) == [
@@ -130,6 +210,92 @@ class TestForEach:
             {self.C(): {"foo": 3}},
         ]
 
+    def test_grid_zip(self) -> None:
+        layer = self.execution.layer(self.E)
+        assert layer.configuration.foreach.grid(layer=layer) == [
+            {self.A(): {"foo": 0}, self.B(): {"bar": 0}},
+            {self.A(): {"foo": 1}, self.B(): {"bar": 1}},
+        ]
+        assert layer.configuration.foreach.splits(layer=layer) == 2
+
+    def test_zip_unequal(self) -> None:
+        layer = self.execution.layer(self.F)
+
+        with pytest.raises(LayerError):
+            layer.configuration.foreach.splits(layer=layer)
+
+    def test_batch_size_invalid(self) -> None:
+        with pytest.raises(LayerError):
+            ForEach(batch_size=0)
+
+    def test_mode_invalid(self) -> None:
+        with pytest.raises(LayerError):
+            ForEach(mode="chain")
+
+    def test_shape(self) -> None:
+        layer = self.execution.layer(self.C)
+        assert layer.configuration.foreach.shape(layer=layer) == (2, 2)
+
+    @pytest.mark.parametrize("name", ["C", "D"])
+    def test_coordinates(self, name: str) -> None:
+        layer = self.execution.layer(name)
+        foreach = layer.configuration.foreach
+
+        # Each split decodes to the same inputs as the materialized grid
+        assert [foreach.coordinates(layer=layer, index=index) for index in range(4)] == foreach.grid(layer=layer)
+
+    def test_coordinates_zip(self) -> None:
+        layer = self.execution.layer(self.E)
+        foreach = layer.configuration.foreach
+
+        assert [foreach.coordinates(layer=layer, index=index) for index in range(2)] == foreach.grid(layer=layer)
+        with pytest.raises(IndexError):
+            foreach.coordinates(layer=layer, index=2)
+
+    def test_coordinates_out_of_range(self) -> None:
+        layer = self.execution.layer(self.C)
+
+        with pytest.raises(IndexError):
+            layer.configuration.foreach.coordinates(layer=layer, index=4)
+
+    def test_plan(self) -> None:
+        layer = self.execution.layer(self.C)
+        assert layer.configuration.foreach.plan(layer=layer) == Plan(
+            inputs=[
+                Plan.Input(
+                    layer="A",
+                    attribute="foo",
+                    archive=Archive(
+                        artifacts=[Artifact(dtype="str", hexdigest="1"), Artifact(dtype="str", hexdigest="2")]
+                    ),
+                ),
+                Plan.Input(
+                    layer="B",
+                    attribute="bar",
+                    archive=Archive(
+                        artifacts=[Artifact(dtype="str", hexdigest="3"), Artifact(dtype="str", hexdigest="4")]
+                    ),
+                ),
+            ]
+        )
+
+    def test_plan_empty(self) -> None:
+        layer = self.execution.layer(self.A)
+        assert layer.configuration.foreach.plan(layer=layer) == Plan(inputs=[])
+
+    def test_plan_cache_hit(self) -> None:
+        plan = Plan(inputs=[Plan.Input(layer="A", attribute="foo", archive=Archive(artifacts=[Artifact("str", "2")]))])
+        self.flow.configuration.datastore.cache["memory:///TestFlow/.cache/test-execution/C/.plan.json"] = plan
+
+        layer = self.execution.layer(self.C, index=0)
+        foreach = layer.configuration.foreach
+        assert foreach.plan(layer=layer) == plan
+        assert foreach.splits(layer=layer) == 1
+
+        # Splits read their inputs from the plan rather than the parameter archives
+        (A,) = foreach.set(layer=layer, parameters=(self.execution.layer(self.A),))
+        assert A.foo is False
+
     def test_splits(self) -> None:
         layer = self.execution.layer(self.C)
         assert layer.configuration.foreach.splits(layer=layer) == 4
@@ -165,3 +331,35 @@ class TestForEach:
 
         assert A.foo is False
         assert B.bar == 1
+
+    def test_set_batch(self) -> None:
+        layer = self.execution.layer(self.G)
+        assert layer.configuration.foreach.splits(layer=layer) == 2
+
+        # Each split is assigned a contiguous batch of the grid
+        layer = self.execution.layer(self.G, index=0)
+        A, B = layer.configuration.foreach.set(
+            layer=layer, parameters=(self.execution.layer(self.A), self.execution.layer(self.B))
+        )
+
+        assert isinstance(A.foo, Accessor)
+        assert list(A.foo) == [True, True, False]
+        assert list(B.bar) == [0, 1, 0]
+
+        # The last batch holds the remainder of the grid
+        layer = self.execution.layer(self.G, index=1)
+        A, B = layer.configuration.foreach.set(
+            layer=layer, parameters=(self.execution.layer(self.A), self.execution.layer(self.B))
+        )
+
+        assert list(A.foo) == [False]
+        assert list(B.bar) == [1]
+
+    def test_set_zip(self) -> None:
+        layer = self.execution.layer(self.E, index=1)
+        A, B = layer.configuration.foreach.set(
+            layer=layer, parameters=(self.execution.layer(self.A), self.execution.layer(self.B))
+        )
+
+        assert A.foo is False
+        assert B.bar == 1
@@ -1,6 +1,7 @@
 """Unit tests for laminar.configurations.schedulers"""
 
 import asyncio
+import threading
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from typing import Any
@@ -8,9 +9,11 @@ from unittest.mock import Mock, patch
 
 import pytest
 
-from laminar import Layer, LayerRun
-from laminar.configurations.datastores import Record
+from laminar import LayerRun
+from laminar.configurations.datastores import Archive, Artifact, Plan, Record
+from laminar.configurations.executors import Thread
 from laminar.configurations.schedulers import Scheduler
+from laminar.exceptions import SchedulerError
 
 
 @asynccontextmanager
@@ -32,11 +35,61 @@ class TestScheduler:
 
             mock_execute.assert_called_once_with(layer=layer)
 
-        assert layer.execution.flow.configuration.datastore.read_record(layer=layer) == Record(
-            flow=Record.FlowRecord(name="TestFlow"),
-            layer=Record.LayerRecord(name="Layer"),
-            execution=Record.ExecutionRecord(splits=1),
-        )
+        record = layer.execution.flow.configuration.datastore.read_record(layer=layer)
+        assert record.flow == Record.FlowRecord(name="TestFlow")
+        assert record.layer == Record.LayerRecord(name="Layer")
+        assert record.execution.splits == 1
+        assert record.execution.submitted is not None and record.execution.finished is not None
+        assert record.execution.submitted <= record.execution.finished
+
+    @pytest.mark.asyncio
+    async def test_schedule_plan(self, layer: LayerRun) -> None:
+        plan = Plan(inputs=[Plan.Input(layer="A", attribute="foo", archive=Archive(artifacts=[Artifact("str", "1")]))])
+
+        with patch("laminar.configurations.layers.ForEach.plan", return_value=plan) as mock_plan:
+            async with coroutine("laminar.configurations.executors.Thread.submit"):
+                await self.scheduler.schedule(layer=layer)
+
+        mock_plan.assert_any_call(layer=layer, cache=False)
+        assert layer.execution.flow.configuration.datastore.read_plan(layer=layer) == plan
+
+    @pytest.mark.asyncio
+    async def test_schedule_compact(self, layer: LayerRun) -> None:
+        async def submit(*, layer: LayerRun) -> LayerRun:
+            return layer
+
+        threads: list[threading.Thread] = []
+
+        with (
+            patch("laminar.configurations.layers.ForEach.splits", return_value=2),
+            patch(
+                "laminar.configurations.layers.ForEach.compact",
+                side_effect=lambda **_: threads.append(threading.current_thread()),
+            ) as mock_compact,
+            patch("laminar.configurations.executors.Thread.submit", side_effect=submit),
+        ):
+            await self.scheduler.schedule(layer=layer)
+
+        mock_compact.assert_called_once_with(layer=layer, splits=2)
+
+        # Compaction doesn't block the event loop
+        (thread,) = threads
+        assert thread is not threading.main_thread()
+
+    @pytest.mark.asyncio
+    async def test_schedule_compact_error(self, layer: LayerRun) -> None:
+        async def submit(*, layer: LayerRun) -> LayerRun:
+            return layer
+
+        with (
+            patch("laminar.configurations.layers.ForEach.splits", return_value=2),
+            patch("laminar.configurations.layers.ForEach.compact", side_effect=FileNotFoundError),
+            patch("laminar.configurations.executors.Thread.submit", side_effect=submit),
+        ):
+            await self.scheduler.schedule(layer=layer)
+
+        # A failed compaction doesn't fail the layer
+        assert layer.execution.flow.configuration.datastore.read_record(layer=layer).execution.splits == 2
 
     @pytest.mark.asyncio
     async def test_schedule_cancels_siblings_on_failure(self, layer: LayerRun) -> None:
@@ -58,37 +111,46 @@ class TestScheduler:
         leaked = [task for task in asyncio.all_tasks() if task is not current and not task.done()]
         assert leaked == []
 
-    def test_runnable(self) -> None:
-        class A(Layer): ...
-
-        class B(Layer):
-            def __call__(self, a: A) -> None: ...
-
-        class C(Layer):
-            def __call__(self, a: A) -> None: ...
-
-        dependencies: dict[str, set[str]] = {"A": set(), "B": {"A"}, "C": {"A"}}
-
-        # Just starting
-        pending, runnable = self.scheduler.runnable(dependencies=dependencies, pending={"A", "B", "C"}, finished=set())
+    def test_loop(self) -> None:
+        events: list[str] = []
 
-        assert runnable == {"A"}
-        assert pending == {"B", "C"}
+        async def schedule(self: Scheduler, *, layer: Mock) -> list[Mock]:
+            events.append(f"start {layer.name}")
+            await asyncio.sleep(0.05 if layer.name == "B" else 0)
+            events.append(f"finish {layer.name}")
+            return [layer]
 
-        # Partially complete
-        pending, runnable = self.scheduler.runnable(dependencies=dependencies, pending={"B", "C"}, finished={"A"})
+        def skippable(self: Scheduler, *, execution: Mock, runnable: set[str], finished: set[str]) -> Any:
+            return runnable, finished
 
-        assert runnable == {"B", "C"}
-        assert pending == set()
+        def layer(name: str) -> Mock:
+            instance = Mock()
+            instance.name = name
+            return instance
 
-        # Partially complete
-        pending, runnable = self.scheduler.runnable(dependencies=dependencies, pending={"C"}, finished={"A", "B"})
+        execution = Mock()
+        execution.layer.side_effect = layer
+        execution.flow.configuration.executor = Thread()
 
-        assert runnable == {"C"}
-        assert pending == set()
-
-        # All complete
-        pending, runnable = self.scheduler.runnable(dependencies=dependencies, pending=set(), finished={"A", "B", "C"})
-
-        assert runnable == set()
-        assert pending == set()
+        with (
+            patch.object(Scheduler, "schedule", autospec=True, side_effect=schedule),
+            patch.object(Scheduler, "skippable", autospec=True, side_effect=skippable),
+        ):
+            self.scheduler.loop(  # type: ignore
+                execution=execution,
+                dependencies={"Parameters": set(), "A": {"Parameters"}, "B": {"Parameters"}, "C": {"A"}},
+                finished={"Parameters"},
+            )
+
+        # C starts as soon as A finishes instead of waiting for B
+        assert events.index("start C") < events.index("finish B")
+        assert sorted(events) == sorted(f"{event} {layer}" for event in ("start", "finish") for layer in "ABC")
+
+    def test_loop_stuck(self) -> None:
+        execution = Mock()
+        execution.flow.configuration.executor = Thread()
+
+        with pytest.raises(SchedulerError):
+            self.scheduler.loop(  # type: ignore
+                execution=execution, dependencies={"A": {"B"}, "B": {"A"}}, finished=set()
+            )
@@ -1,6 +1,15 @@
 """Unit tests for laminar.configurations.protocol"""
 
+import hashlib
+import io
+import pickle
+from pathlib import Path
+from typing import Any
+
+import pytest
+
 from laminar.configurations import serde
+from laminar.utils import fs
 
 
 class TestDtype:
@@ -9,3 +18,139 @@ class TestDtype:
 
     def test_custom(self) -> None:
         assert serde.dtype(serde.Protocol) == "laminar.configurations.serde.Protocol"
+
+
+class TestProtocol:
+    def test_stage(self) -> None:
+        file = io.BytesIO()
+
+        assert serde.PickleProtocol().stage("test-value", file) == serde.PickleProtocol().hexdigest("test-value")
+        assert file.getvalue() == serde.PickleProtocol().dumps("test-value")
+
+    def test_stage_custom_hexdigest(self) -> None:
+        class NamedProtocol(serde.Protocol):
+            def dumps(self, value: Any) -> bytes:
+                return str(value).encode()
+
+            def hexdigest(self, value: Any) -> str:
+                return "custom"
+
+        file = io.BytesIO()
+
+        assert NamedProtocol().stage("test-value", file) == "custom"
+        assert file.getvalue() == b"test-value"
+
+
+class TestDigest:
+    def test_write(self) -> None:
+        file = io.BytesIO()
+        digest = serde.Digest(file)
+        digest.write(b"foo")
+        digest.write(b"bar")
+
+        assert file.getvalue() == b"foobar"
+        assert digest.hexdigest() == hashlib.sha256(b"foobar").hexdigest()
+
+
+class TestBufferProtocol:
+    protocol = serde.BufferProtocol()
+
+    def test_roundtrip(self) -> None:
+        value = {
+            "small": pickle.PickleBuffer(bytearray(b"abc")),
+            "large": pickle.PickleBuffer(bytearray(range(256)) * 1024),
+            "other": [1, "a"],
+        }
+
+        loaded = self.protocol.loads(self.protocol.dumps(value))
+
+        assert bytes(loaded["small"]) == b"abc"
+        assert bytes(loaded["large"]) == bytes(range(256)) * 1024
+        assert loaded["other"] == [1, "a"]
+
+    def test_out_of_band(self) -> None:
+        large = bytearray(b"x") * (self.protocol.threshold + 1)
+        stream = self.protocol.dumps({"large": pickle.PickleBuffer(large)})
+
+        # The large buffer is written once as a raw aligned segment, not copied into the pickle stream
+        assert stream.count(bytes(large)) == 1
+        assert stream.index(bytes(large)) % self.protocol.alignment == 0
+
+    def test_load_file(self, tmp_path: Path) -> None:
+        large = bytearray(b"y") * (self.protocol.threshold * 2)
+        path = tmp_path / "artifact"
+        path.write_bytes(self.protocol.dumps([pickle.PickleBuffer(large), "a"]))
+
+        # Compressed or remote streams are read into memory
+        buffer, other = self.protocol.load(io.BytesIO(path.read_bytes()))
+        assert (bytes(buffer), other) == (bytes(large), "a")
+
+        # Local files are memory mapped copy-on-write
+        buffer, other = self.protocol.view(fs.mapped(uri=str(path)))
+        assert (bytes(buffer), other) == (bytes(large), "a")
+        buffer[0] = ord("z")
+        assert path.read_bytes().count(b"z") == 0
+
+    def test_numpy(self, tmp_path: Path) -> None:
+        numpy = pytest.importorskip("numpy")
+
+        array = numpy.arange(100_000, dtype="float64")
+        path = tmp_path / "artifact"
+        with open(path, "wb") as file:
+            hexdigest = self.protocol.stage(array, file)
+
+        assert hexdigest == hashlib.sha256(path.read_bytes()).hexdigest()
+        loaded = self.protocol.view(fs.mapped(uri=str(path)))
+
+        assert not loaded.flags.owndata
+        assert loaded.flags.writeable
+        numpy.testing.assert_array_equal(loaded, array)
+
+    def test_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            self.protocol.loads(serde.PickleProtocol().dumps("test-value") + bytes(24))
+
+
+class TestBytesProtocol:
+    protocol = serde.BytesProtocol()
+
+    def test_roundtrip(self) -> None:
+        assert self.protocol.dumps(b"foo") == b"foo"
+        assert self.protocol.loads(b"foo") == b"foo"
+        assert self.protocol.load(io.BytesIO(b"foo")) == b"foo"
+
+    def test_view(self) -> None:
+        buffer = memoryview(bytearray(b"foo"))
+        assert self.protocol.view(buffer) is buffer
+
+
+class TestNumpyProtocol:
+    protocol = serde.NumpyProtocol()
+
+    @pytest.mark.parametrize("order", ["C", "F"])
+    def test_roundtrip(self, order: str) -> None:
+        numpy = pytest.importorskip("numpy")
+
+        array = numpy.asarray(numpy.arange(12, dtype="int32").reshape(3, 4), order=order)
+        stream = self.protocol.dumps(array)
+
+        numpy.testing.assert_array_equal(self.protocol.loads(stream), array)
+        numpy.testing.assert_array_equal(self.protocol.view(memoryview(bytearray(stream))), array)
+
+    def test_view(self, tmp_path: Path) -> None:
+        numpy = pytest.importorskip("numpy")
+
+        array = numpy.arange(100_000, dtype="float64")
+        path = tmp_path / "artifact"
+        path.write_bytes(self.protocol.dumps(array))
+
+        # The array is backed by the mapped file instead of a copy
+        loaded = self.protocol.view(fs.mapped(uri=str(path)))
+        assert not loaded.flags.owndata
+        numpy.testing.assert_array_equal(loaded, array)
+
+    def test_object(self) -> None:
+        numpy = pytest.importorskip("numpy")
+
+        with pytest.raises(ValueError):
+            self.protocol.dumps(numpy.array([{}], dtype=object))
@@ -8,8 +8,8 @@ import cloudpickle
 import pytest
 
 from laminar import Flow, Layer, LayerRun, Parameters
-from laminar.components import LayerDefinition
-from laminar.configurations import hooks, layers, serde
+from laminar.components import Graph, LayerDefinition
+from laminar.configurations import datastores, hooks, layers, serde
 from laminar.configurations.datastores import Accessor, Archive, Artifact, Memory
 from laminar.exceptions import FlowError
 from laminar.utils import contexts
@@ -83,6 +83,123 @@ class TestLayer:
 
         assert calls == [0, 0]
 
+    def test_execute_metrics(self, flow: Flow) -> None:
+        @flow.register(retry=layers.Retry(attempts=2))
+        class Test(Layer):
+            def __call__(self) -> None:
+                self.foo = "bar"
+
+        run = flow.test_execution.layer(Test, index=0, splits=1, attempt=2)
+        flow.test_execution.execute(layer=run)
+        flow.configuration.datastore.write_record(
+            layer=run,
+            record=datastores.Record(
+                flow=datastores.Record.FlowRecord(name="TestFlow"),
+                layer=datastores.Record.LayerRecord(name="Test"),
+                execution=datastores.Record.ExecutionRecord(splits=1),
+            ),
+        )
+
+        (metrics,) = flow.configuration.datastore.read_metrics(layer=run)
+        assert metrics.attempt == 2
+        assert metrics.written > 0
+        assert 0 <= metrics.serialization <= metrics.duration
+
+    def test_execute_metrics_attempts(self, flow: Flow) -> None:
+        @flow.register(retry=layers.Retry(attempts=2))
+        class Test(Layer):
+            def __call__(self) -> None:
+                if self.attempt == 1:
+                    raise RuntimeError
+                self.foo = "bar"
+
+        # Failed attempts leave behind their own metrics
+        with pytest.raises(RuntimeError):
+            flow.test_execution.execute(layer=flow.test_execution.layer(Test, index=0, splits=1, attempt=1))
+        run = flow.test_execution.layer(Test, index=0, splits=1, attempt=2)
+        flow.test_execution.execute(layer=run)
+        flow.configuration.datastore.write_record(
+            layer=run,
+            record=datastores.Record(
+                flow=datastores.Record.FlowRecord(name="TestFlow"),
+                layer=datastores.Record.LayerRecord(name="Test"),
+                execution=datastores.Record.ExecutionRecord(splits=1),
+            ),
+        )
+
+        datastore = flow.configuration.datastore
+        assert [metrics.attempt for metrics in datastore.read_metrics(layer=run)] == [2]
+        assert [metrics.attempt for metrics in datastore.read_metrics(layer=run, attempts=True)] == [1, 2]
+
+    def test_hook_table(self, flow: Flow) -> None:
+        @flow.register
+        class Dep(Layer): ...
+
+        @flow.register
+        class Test(Layer):
+            @hooks.submission
+            def configure(self, dep: Dep) -> None: ...
+
+        first, second = flow.test_execution.layer(Test, index=0), flow.test_execution.layer(Test, index=1)
+
+        # Splits share the table built for their runtime class
+        assert first._table is second._table
+        assert first.hooks == {hooks.annotation.submission: {Test.configure}}
+        assert first._parameters == {"__call__": (), "configure": (Dep(),)}
+        assert first.dependencies == {"Dep"}
+
+    def test_hook_table_flow(self, flow: Flow) -> None:
+        @flow.register
+        class Test(Layer): ...
+
+        base = flow.test_execution.layer(Test)
+
+        class SubFlow(type(flow)):  # type: ignore[misc]
+            @hooks.entry
+            def enter(self) -> bool:
+                return True
+
+        sub = SubFlow(datastore=flow.configuration.datastore, executor=flow.configuration.executor).execution("test")
+
+        # The subflow shares the runtime class, but flow hooks belong to the flow class the layer runs in
+        assert type(sub.layer(Test)) is type(base)
+        assert base.hooks == {}
+        assert sub.layer(Test).hooks == {hooks.annotation.entry: {SubFlow.enter}}
+
+    def test_configuration_copy_on_write(self, flow: Flow) -> None:
+        @flow.register(container=layers.Container(memory=1000))
+        class Test(Layer):
+            @hooks.execution
+            def configure(self) -> None:
+                self.configuration.container.memory = 2000
+
+            def __call__(self) -> None: ...
+
+        definition = flow.registry["Test"]
+
+        run = flow.test_execution.layer(Test, index=0)
+        flow.test_execution.execute(layer=run)
+        assert run.configuration is not definition.configuration
+        assert (run.configuration.container.memory, definition.configuration.container.memory) == (2000, 1000)
+
+    def test_configuration_modified_outside_hook(self, flow: Flow) -> None:
+        @flow.register(container=layers.Container(memory=1000), retry=layers.Retry(attempts=2))
+        class Test(Layer):
+            def __call__(self) -> None:
+                self.configuration.container.memory = 2000
+                self.configuration.retry.attempts = 3
+
+        definition = flow.registry["Test"]
+
+        run = flow.test_execution.layer(Test, index=0)
+        flow.test_execution.execute(layer=run)
+        assert (run.configuration.container.memory, run.configuration.retry.attempts) == (2000, 3)
+
+        # Neither the definition nor later runs see the modification
+        assert (definition.configuration.container.memory, definition.configuration.retry.attempts) == (1000, 2)
+        other = flow.test_execution.layer(Test, index=0)
+        assert (other.configuration.container.memory, other.configuration.retry.attempts) == (1000, 2)
+
     def test_dependencies(self, flow: Flow) -> None:
         @flow.register
         class Dep1(Layer): ...
@@ -202,6 +319,24 @@ class TestFLow:
         assert flow.dependencies == {"Dep1": set(), "Dep2": set(), "Parameters": set(), "Test": {"Dep1", "Dep2"}}
         assert flow.dependents == {"Dep1": {"Test"}, "Dep2": {"Test"}}
 
+    def test_graph(self, flow: Flow) -> None:
+        @flow.register
+        class Dep(Layer): ...
+
+        graph = flow.graph
+
+        # The graph is compiled once per flow class
+        assert flow.graph is graph
+        assert type(flow)().graph is graph
+
+        @flow.register
+        class Test(Layer):
+            def __call__(self, dep: Dep) -> None: ...
+
+        # Registering a layer recompiles the graph
+        assert flow.graph is not graph
+        assert flow.graph.order == ("Dep", "Parameters", "Test")
+
     def test_call_schedule(self, flow: Flow) -> None:
         mock_execution = MagicMock()
         mock_execution.id = None
@@ -211,7 +346,7 @@ class TestFLow:
         flow()
 
         mock_execution.return_value.parameters.return_value.schedule.assert_called_once_with(
-            dependencies={"Parameters": mock_execution.return_value.layer.return_value.dependencies}
+            dependencies={"Parameters": set()}
         )
 
     def test_call_execute(self, flow: Flow) -> None:
@@ -266,6 +401,9 @@ class TestFLow:
         assert flow.dependencies == {"Dep1": set(), "Dep2": set(), "Parameters": set(), "Test": {"Dep1", "Dep2"}}
         assert flow.dependents == {"Dep1": {"Test"}, "Dep2": {"Test"}}
 
+        # Layers without dependents have no dependents
+        assert flow.dependents["Test"] == set()
+
     def test_layer_duplicate(self, flow: Flow) -> None:
         @flow.register
         class Test(Layer): ...
@@ -304,7 +442,62 @@ class TestFLow:
         assert flow.execution("test-execution").id == "test-execution"
 
 
+class TestGraph:
+    def test_compile(self) -> None:
+        graph = Graph.compile({"A": set(), "B": {"A"}, "C": {"A"}, "D": {"B", "C"}})
+
+        assert graph.dependencies == {"A": set(), "B": {"A"}, "C": {"A"}, "D": {"B", "C"}}
+        assert graph.dependents == {"A": {"B", "C"}, "B": {"D"}, "C": {"D"}, "D": set()}
+        assert graph.levels == (frozenset({"A"}), frozenset({"B", "C"}), frozenset({"D"}))
+        assert graph.order == ("A", "B", "C", "D")
+
+    def test_immutable(self) -> None:
+        graph = Graph.compile({"A": set()})
+
+        with pytest.raises(TypeError):
+            graph.dependencies["B"] = frozenset()  # type: ignore[index]
+
+    def test_circular(self) -> None:
+        with pytest.raises(FlowError):
+            Graph.compile({"A": {"C"}, "B": {"A"}, "C": {"B"}, "D": set()})
+
+    def test_priorities(self) -> None:
+        graph = Graph.compile({"A": set(), "B": {"A"}, "C": {"A"}, "D": {"B", "C"}, "E": set()})
+
+        # The critical path runs through the most expensive branch
+        assert graph.priorities({"A": 1.0, "B": 5.0, "C": 1.0, "D": 2.0, "E": 1.0}) == {
+            "A": 8.0,
+            "B": 7.0,
+            "C": 3.0,
+            "D": 2.0,
+            "E": 1.0,
+        }
+
+
 class TestExecution:
     def test_execute(self) -> None: ...
 
     def test_schedule(self) -> None: ...
+
+    def test_records(self, flow: Flow) -> None:
+        @flow.register
+        class A(Layer):
+            def __call__(self) -> None: ...
+
+        @flow.register
+        class B(Layer):
+            def __call__(self, a: A) -> None: ...
+
+        with patch.object(Memory, "list_records", autospec=True, side_effect=Memory.list_records) as mock_list:
+            execution = flow(execution="test-execution")
+
+            # The datastore is listed once per schedule and completions are added as the scheduler records them
+            mock_list.assert_called_once()
+
+            # Outside of the scheduling loop, the datastore is listed on every read
+            assert execution.records == {"Parameters", "A", "B"}
+            assert mock_list.call_count == 2
+
+            # Checking every layer reads a single listing
+            assert execution.finished
+            assert mock_list.call_count == 3
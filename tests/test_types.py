@@ -1,5 +1,8 @@
 """Unit tests for laminar.types"""
 
+import typing
+from unittest.mock import patch
+
 import pytest
 
 from laminar import Flow, Layer, types
@@ -26,6 +29,22 @@ class TestHints:
 
         assert types.hints(flow.execution("test"), test) == (ForwardRef(flow=flow),)
 
+    def test_cached(self) -> None:
+        def test(a: "Ref", b: "ForwardRef") -> None: ...
+
+        with patch("laminar.types.get_type_hints", wraps=typing.get_type_hints) as mock_hints:
+            assert types.names(test) == ("Ref", "ForwardRef")
+            assert types.names(test) == ("Ref", "ForwardRef")
+
+        mock_hints.assert_called_once_with(test)
+
+    def test_bound_method(self) -> None:
+        class Test:
+            def method(self, a: Ref) -> None: ...
+
+        assert types.names(Test().method) == ("Ref",)
+        assert types.HINTS[Test.method] == ("Ref",)
+
 
 @HintFlow.register
 class ForwardRef(Layer): ...
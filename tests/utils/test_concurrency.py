@@ -0,0 +1,98 @@
+"""Unit tests for laminar.utils.concurrency"""
+
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from laminar.utils import concurrency
+
+
+class TestImap:
+    def test_serial(self) -> None:
+        assert list(concurrency.imap(lambda value: value * 2, [1, 2, 3], concurrency=1)) == [2, 4, 6]
+
+    def test_ordered(self) -> None:
+        def delay(value: int) -> int:
+            time.sleep(0.01 * (5 - value))
+            return value
+
+        assert list(concurrency.imap(delay, range(5), concurrency=5)) == [0, 1, 2, 3, 4]
+
+    def test_bounded(self) -> None:
+        lock = threading.Lock()
+        active: list[int] = [0]
+        peak: list[int] = [0]
+
+        def track(value: int) -> int:
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return value
+
+        assert list(concurrency.imap(track, range(20), concurrency=3)) == list(range(20))
+        assert 1 < peak[0] <= 3
+
+    def test_error(self) -> None:
+        def fail(value: int) -> int:
+            if value == 2:
+                raise RuntimeError
+            return value
+
+        with pytest.raises(RuntimeError):
+            list(concurrency.imap(fail, range(10), concurrency=4))
+
+    def test_context(self) -> None:
+        variable: contextvars.ContextVar[str] = contextvars.ContextVar("variable", default="unset")
+        token = variable.set("set")
+        try:
+            assert list(concurrency.imap(lambda _: variable.get(), range(4), concurrency=2)) == ["set"] * 4
+        finally:
+            variable.reset(token)
+
+
+@pytest.mark.asyncio
+class TestPrioritySemaphore:
+    async def test_priority(self) -> None:
+        semaphore = concurrency.PrioritySemaphore(1)
+        admitted: list[float] = []
+
+        async def wait() -> None:
+            async with semaphore:
+                admitted.append(concurrency.PRIORITY.get())
+
+        await semaphore.acquire()
+        assert semaphore.locked()
+
+        tasks = []
+        for priority in (1.0, 3.0, 2.0, 3.0):
+            token = concurrency.PRIORITY.set(priority)
+            tasks.append(asyncio.create_task(wait()))
+            concurrency.PRIORITY.reset(token)
+        await asyncio.sleep(0)
+
+        semaphore.release()
+        await asyncio.gather(*tasks)
+
+        assert admitted == [3.0, 3.0, 2.0, 1.0]
+        assert not semaphore.locked()
+
+    async def test_cancel(self) -> None:
+        semaphore = concurrency.PrioritySemaphore(1)
+        await semaphore.acquire()
+
+        task = asyncio.create_task(semaphore.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # A cancelled waiter doesn't hold on to the semaphore
+        semaphore.release()
+        assert not semaphore.locked()
@@ -1,6 +1,9 @@
 """Unit tests for laminar.utils.fs"""
 
 from pathlib import Path
+from unittest.mock import Mock, patch
+
+from botocore.exceptions import ClientError
 
 from laminar.utils import fs
 
@@ -10,5 +13,45 @@ def test_exists() -> None:
     assert not fs.exists(uri=str(Path(__file__).resolve() / "foo.bar"))
 
 
+def test_exists_directory(tmp_path: Path) -> None:
+    assert not fs.exists(uri=str(tmp_path))
+
+
+@patch("laminar.utils.fs.s3")
+def test_exists_s3(mock_s3: Mock) -> None:
+    assert fs.exists(uri="s3://bucket/path/to/file")
+    mock_s3.return_value.head_object.assert_called_once_with(Bucket="bucket", Key="path/to/file")
+
+    mock_s3.return_value.head_object.side_effect = ClientError({"Error": {"Code": "404"}}, "HeadObject")
+    assert not fs.exists(uri="s3://bucket/path/to/file")
+
+
+def test_exists_many(tmp_path: Path) -> None:
+    (tmp_path / "a").touch()
+    (tmp_path / "c").touch()
+
+    uris = [str(tmp_path / name) for name in "abc"]
+    assert fs.exists_many(uris=uris, concurrency=2) == [True, False, True]
+
+
+def test_mapped(tmp_path: Path) -> None:
+    path = tmp_path / "file"
+    path.write_bytes(b"foo")
+
+    view = fs.mapped(uri=str(path))
+    assert bytes(view) == b"foo"
+
+    # Maps are copy-on-write
+    view[0] = ord("b")
+    assert path.read_bytes() == b"foo"
+
+
+def test_mapped_empty(tmp_path: Path) -> None:
+    path = tmp_path / "file"
+    path.touch()
+
+    assert bytes(fs.mapped(uri=str(path))) == b""
+
+
 def test_join() -> None:
     assert fs.join("path", "to", "something") == "path/to/something"